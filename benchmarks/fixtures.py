@@ -0,0 +1,77 @@
+# Deterministic inputs for the benchmarks: FBref-shaped HTML pages and synthetic
+# player tables with every column the parsers and the scoring read.
+
+import numpy as np
+import pandas as pd
+
+from scoring import ROLE_WEIGHTS, weight_matrix
+from scrapefbref import ROLE_LABELS
+
+TM_POSITIONS = ["Goalkeeper", "Centre-Back", "Left-Back", "Right-Back", "Defensive Midfield",
+                "Central Midfield", "Attacking Midfield", "Left Winger", "Right Winger", "Centre-Forward",
+                "Second Striker"]
+FBREF_POSITIONS = ["GK", "DF", "DF,MF", "MF", "MF,FW", "FW", "FW,MF"]
+STANDARD_HEADERS = ["Player", "Nation", "Pos", "Age", "MP", "Starts", "Min", "90s", "Gls", "Ast", "G+A",
+                    "G-PK", "PK", "PKatt", "CrdY", "CrdR", "xG", "npxG", "xAG", "npxG+xAG", "PrgC", "PrgP",
+                    "PrgR", "Gls", "Ast", "G+A", "G-PK", "G+A-PK", "xG", "xAG", "xG+xAG", "npxG", "npxG+xAG"]
+
+
+def club_page(n_players: int = 40, seed: int = 0, commented: bool = True) -> str:
+    """A squad page with the stats_standard_combined table (inside an HTML comment, as FBref ships it)."""
+    rng = np.random.default_rng(seed)
+    head = "".join(f"<th>{h}</th>" for h in STANDARD_HEADERS)
+    body = []
+    for i in range(n_players):
+        cells = [f'<td data-stat="nationality">eng ENG</td>',
+                 f'<td data-stat="position">{FBREF_POSITIONS[i % len(FBREF_POSITIONS)]}</td>']
+        cells += [f"<td>{v:,.2f}</td>" for v in rng.gamma(2.0, 3.0, len(STANDARD_HEADERS) - 3)]
+        body.append(f'<tr><th data-stat="player"><a href="/en/players/{i:08x}/Player-{i}">Player {i}</a></th>'
+                    + "".join(cells) + "</tr>")
+    table = (f'<table class="stats_table" id="stats_standard_combined"><thead><tr>{head}</tr></thead>'
+             f'<tbody>{"".join(body)}</tbody></table>')
+    filler = "".join(f'<div class="filler"><p>{"lorem ipsum " * 40}</p></div>' for _ in range(200))
+    wrapped = f"<!--{table}-->" if commented else table
+    return f'<html><body>{filler}<div id="all_stats_standard_combined">{wrapped}</div>{filler}</body></html>'
+
+
+def profile_page(seed: int = 0) -> str:
+    """A player page with trophies and one scouting-report table carrying every label we read."""
+    rng = np.random.default_rng(seed)
+    labels = sorted({next(iter(syn)) for labels in ROLE_LABELS.values() for syn in labels.values()})
+    rows = "".join(f"<tr><th>{lab}</th><td>{v:.2f}</td><td>{int(p)}</td></tr>"
+                   for lab, v, p in zip(labels, rng.gamma(2.0, 1.0, len(labels)), rng.integers(1, 99, len(labels))))
+    decoy = ('<table class="stats_table"><thead><tr><th>Season</th><th>Gls</th></tr></thead>'
+             + "".join(f"<tbody><tr><th>20{y:02d}</th><td>{y}</td></tr></tbody>" for y in range(10, 25)) + "</table>")
+    scouting = (f'<table class="stats_table"><thead><tr><th>Statistic</th><th>Per 90</th><th>Percentile</th></tr>'
+                f"</thead><tbody>{rows}</tbody></table>")
+    bling = "".join(f'<li class="important poptip">{k}x Champion {k}</li>' for k in range(1, 6))
+    filler = "".join(f'<div class="filler"><p>{"lorem ipsum " * 40}</p></div>' for _ in range(300))
+    return f'<html><body><ul id="bling">{bling}</ul>{filler}{decoy * 6}{scouting}{filler}</body></html>'
+
+
+def player_table(n: int, seed: int = 0) -> pd.DataFrame:
+    """`n` merged rows (Transfermarkt text columns + FBref stats) shaped like all_squads.csv."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "player": [f"Player {i}" for i in range(n)],
+        "Position": rng.choice(TM_POSITIONS, n),
+        "90s Played": np.round(rng.uniform(0, 45, n), 1),
+        "Yellow Cards": rng.integers(0, 12, n).astype(float),
+        "Red Cards": rng.integers(0, 2, n).astype(float),
+        "Progressive Carries": rng.integers(0, 150, n).astype(float),
+        "Progressive Passes": rng.integers(0, 300, n).astype(float),
+        "Progressive Passes Received": rng.integers(0, 300, n).astype(float),
+    })
+    for f in weight_matrix(ROLE_WEIGHTS).index:
+        if f in df.columns or f.startswith(("prog_", "discipline")):
+            continue
+        vals = rng.gamma(2.0, 1.0, n)
+        vals[rng.random(n) < 0.3] = np.nan   # profile stats are missing for other roles
+        df[f] = vals
+    amounts = rng.integers(1, 2000, n) * 50
+    mv = np.where(amounts >= 1000, [f"€{a / 1000:.2f}m" for a in amounts], [f"€{a}k" for a in amounts])
+    df["Market value"] = np.where(rng.random(n) < 0.03, "N/A", mv)
+    days, months, years = rng.integers(1, 29, n), rng.integers(1, 13, n), rng.integers(1985, 2008, n)
+    df["Date of birth / Age"] = [f"{d:02d}.{m:02d}.{y} ({2025 - y})" for d, m, y in zip(days, months, years)]
+    df["Height"] = [f"1,{h:02d}m" for h in rng.integers(60, 99, n)]
+    return df
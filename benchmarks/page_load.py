@@ -0,0 +1,73 @@
+# Page-load timing of the old full browser against the lean profile in browser.py.
+# Needs Chrome and network access; each URL is loaded --repeat times per profile, in
+# alternating order so neither profile benefits from a warmer network path.
+# Usage: python -m benchmarks.page_load [--repeat 3] [URL ...]
+
+import argparse
+import statistics
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from browser import make_driver
+from leagues import fbref_squad_url
+from scrapefbref import CLUBS as FBREF_CLUBS
+from scrapetransfermarket import club_confs
+
+PROFILES = {
+    "full": dict(headless=False, lean=False),   # what both scrapers used before
+    "lean": dict(headless=True, lean=True),
+}
+# the element each scraper actually waits for before parsing
+READY = {
+    "transfermarkt": (By.CSS_SELECTOR, "table.items"),
+    "fbref": (By.XPATH, "//*[@id='stats_standard_combined' or @id='all_stats_standard_combined']"),
+}
+
+
+def default_urls() -> list[str]:
+    return [club_confs()[0]["url"], fbref_squad_url(*next(iter(FBREF_CLUBS.values())))]
+
+
+def time_load(driver, url: str) -> tuple[float, int]:
+    """Seconds until driver.get returns and the scraped table is present; plus page size."""
+    locator = READY["fbref" if "fbref.com" in url else "transfermarkt"]
+    t0 = time.perf_counter()
+    driver.get(url)
+    WebDriverWait(driver, 60).until(EC.presence_of_element_located(locator))
+    return time.perf_counter() - t0, len(driver.page_source)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("urls", nargs="*")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    urls = args.urls or default_urls()
+
+    drivers = {name: make_driver(**kw) for name, kw in PROFILES.items()}
+    times = {(name, u): [] for name in drivers for u in urls}
+    try:
+        for u in urls:
+            for name, driver in drivers.items():   # warm-up: consent popups, DNS, connection reuse
+                time_load(driver, u)
+            for i in range(args.repeat):
+                order = list(drivers) if i % 2 == 0 else list(reversed(drivers))
+                for name in order:
+                    seconds, _ = time_load(drivers[name], u)
+                    times[(name, u)].append(seconds)
+    finally:
+        for driver in drivers.values():
+            driver.quit()
+
+    print(f"{'URL':<60}{'full s':>9}{'lean s':>9}{'speedup':>9}")
+    for u in urls:
+        full = statistics.median(times[("full", u)])
+        lean = statistics.median(times[("lean", u)])
+        print(f"{u[:58]:<60}{full:>9.2f}{lean:>9.2f}{full / lean:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Per-row .apply() vs the vectorized tmparse parsers on synthetic Transfermarkt columns.
+# Usage: python -m benchmarks.parsers [--rows 1000000]
+
+import argparse
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from tmparse import (age_at, market_value_to_eur, parse_birth_date, parse_height_cm,
+                     parse_market_value)
+
+REF_DATE = "2025-06-30"
+
+
+def synthetic_columns(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(1, 2000, n) * 50
+    mv = np.where(amounts >= 1000, [f"€{a / 1000:.2f}m" for a in amounts], [f"€{a}k" for a in amounts])
+    mv = np.where(rng.random(n) < 0.03, "N/A", mv)
+    days, months, years = rng.integers(1, 29, n), rng.integers(1, 13, n), rng.integers(1985, 2008, n)
+    dob = [f"{d:02d}.{m:02d}.{y} ({2025 - y})" for d, m, y in zip(days, months, years)]
+    height = [f"1,{h:02d}m" for h in rng.integers(60, 99, n)]
+    return pd.DataFrame({"Market value": mv, "Date of birth / Age": dob, "Height": height})
+
+
+def legacy_birth_date(x):
+    try:
+        return datetime.strptime(str(x).split(" ")[0], "%d.%m.%Y")
+    except ValueError:
+        return None
+
+
+def legacy_age_at(birth, ref: date):
+    if birth is None or pd.isna(birth):
+        return pd.NA
+    return ref.year - birth.year - ((birth.month, birth.day) > (ref.month, ref.day))
+
+
+def legacy_height_cm(x):
+    try:
+        return round(float(str(x).replace(",", ".").rstrip("m")) * 100, 1)
+    except ValueError:
+        return np.nan
+
+
+def _bench(label, fn):
+    t0 = time.perf_counter()
+    out = fn()
+    dt = time.perf_counter() - t0
+    print(f"  {label:<12}{dt:8.2f}s")
+    return out, dt
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    args = ap.parse_args()
+
+    df = synthetic_columns(args.rows)
+    print(f"{args.rows:,} rows")
+
+    print("Market value")
+    a, t_row = _bench("per-row", lambda: df["Market value"].apply(market_value_to_eur))
+    b, t_vec = _bench("vectorized", lambda: parse_market_value(df["Market value"]))
+    assert np.allclose(a, b, equal_nan=True), "market value mismatch"
+    print(f"  speedup     {t_row / t_vec:8.1f}x")
+
+    print("Date of birth / Age")
+    a, t_row = _bench("per-row", lambda: df["Date of birth / Age"].apply(legacy_birth_date))
+    b, t_vec = _bench("vectorized", lambda: parse_birth_date(df["Date of birth / Age"])["birth_date"])
+    assert (pd.to_datetime(a) == b).all(), "birth date mismatch"
+    print(f"  speedup     {t_row / t_vec:8.1f}x")
+
+    print(f"Age at {REF_DATE}")
+    ref = date.fromisoformat(REF_DATE)
+    births = b
+    a, t_row = _bench("per-row", lambda: births.apply(lambda d: legacy_age_at(d, ref)))
+    b, t_vec = _bench("vectorized", lambda: age_at(births, REF_DATE))
+    assert (a.astype("Int64") == b).all(), "age mismatch"
+    print(f"  speedup     {t_row / t_vec:8.1f}x")
+
+    print("Height")
+    a, t_row = _bench("per-row", lambda: df["Height"].apply(legacy_height_cm))
+    b, t_vec = _bench("vectorized", lambda: parse_height_cm(df["Height"]))
+    assert np.allclose(a, b, equal_nan=True), "height mismatch"
+    print(f"  speedup     {t_row / t_vec:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Compare the single-pass profile extractor with the original two-parse path.
+# Usage: python -m benchmarks.profile_extract [--pages cache/pages/fbref.com] [--repeat 3]
+
+import argparse
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from scrapefbref import ROLE_LABELS, _norm_label, extract_profile
+
+
+def legacy_parse_scouting_per90(profile_html: str, desired_map: dict[str, set[str]]) -> dict:
+    """The pre-index implementation: fresh parse plus a label x synonym-set scan per row."""
+    soup = BeautifulSoup(profile_html, "lxml")
+    out = {col: "" for col in desired_map.keys()}
+    for tb in soup.select("table.stats_table"):
+        thead = tb.find("thead")
+        if not thead:
+            continue
+        head_cols = [th.get_text(strip=True).lower() for th in thead.find_all("th")]
+        if not any("per 90" in c for c in head_cols) or not any("percentile" in c for c in head_cols):
+            continue
+        tbody = tb.find("tbody")
+        if not tbody:
+            continue
+        for tr in tbody.find_all("tr"):
+            stat_th = tr.find("th")
+            tds = tr.find_all("td")
+            if not stat_th or len(tds) < 1:
+                continue
+            label = _norm_label(stat_th.get_text(strip=True))
+            per90 = tds[0].get_text(strip=True)
+            for out_col, synset in desired_map.items():
+                if label in synset and not out[out_col]:
+                    out[out_col] = per90
+        if all(out[v] != "" for v in out):
+            break
+    return out
+
+
+def legacy_extract(profile_html: str, role: str) -> tuple[list[str], dict]:
+    psoup = BeautifulSoup(profile_html, "lxml")
+    trophies = []
+    bling_ul = psoup.find("ul", id="bling")
+    if bling_ul:
+        trophies = [li.get_text(strip=True) for li in bling_ul.find_all("li", class_="important poptip")]
+    return trophies, legacy_parse_scouting_per90(profile_html, ROLE_LABELS[role])
+
+
+def _time(fn, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for html in pages:
+            for role in ROLE_LABELS:
+                fn(html, role)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", default=str(Path("cache") / "pages" / "fbref.com"),
+                    help="directory of saved FBref player pages (*.html)")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    pages = [p.read_text(encoding="utf-8") for p in sorted(Path(args.pages).glob("*.html"))]
+    pages = [html for html in pages if 'id="bling"' in html or "Scouting Report" in html]
+    if not pages:
+        print(f"No saved profile pages under {args.pages} — run scrapefbref.py first.")
+        return
+
+    mismatches = sum(extract_profile(html, role) != legacy_extract(html, role)
+                     for html in pages for role in ROLE_LABELS)
+    legacy = _time(legacy_extract, pages, args.repeat)
+    single = _time(extract_profile, pages, args.repeat)
+    n = len(pages) * len(ROLE_LABELS)
+    print(f"{len(pages)} pages x {len(ROLE_LABELS)} roles, {mismatches} mismatching extractions")
+    print(f"legacy (two parses, nested label scan): {legacy:.3f}s  ({legacy / n * 1000:.2f} ms/extract)")
+    print(f"single pass + label index:              {single:.3f}s  ({single / n * 1000:.2f} ms/extract)")
+    print(f"speedup: {legacy / single:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# Benchmark suite over the parsing and ranking hot paths.
+#
+# HTML cases run on generated FBref-shaped pages (plus any saved pages passed with
+# --pages); table cases run on synthetic player tables at each --sizes row count.
+# Results are written as JSON; `compare` checks a run against a baseline and exits
+# non-zero on a regression, so it can gate the nightly run.
+# Usage:
+#   python -m benchmarks.suite run [--sizes 1000 100000 1000000] [--repeat 3] [--only PATTERN]
+#                                  [--pages cache/pages/fbref.com] [--out FILE]
+#   python -m benchmarks.suite compare BASELINE.json CURRENT.json [--tolerance 0.10]
+
+import argparse
+import fnmatch
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fixtures import club_page, player_table, profile_page
+from scoring import (ROLE_WEIGHTS, RankingConfig, add_role_and_features, feature_frame, map_role, rank_players,
+                     standardize_by_role, weight_matrix)
+from scrapefbref import MIDFIELDER_LABELS, SQUAD_TABLE_IDS, classify_role, extract_profile, \
+    find_table_from_page_source, find_tables_from_page_source, maybe_to_numeric, parse_scouting_per90
+from tmparse import market_value_to_eur, parse_market_value
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SIZES = [1_000, 100_000, 1_000_000]
+MIN_90S = 20
+
+
+def html_cases(pages_dir: str | None) -> dict:
+    """name -> zero-argument callable, for the per-page parsers."""
+    club_pages = {"fixture": [club_page(40)]}
+    profile_pages = {"fixture": [profile_page(i) for i in range(5)]}
+    if pages_dir:
+        saved = [p.read_text(encoding="utf-8", errors="replace") for p in sorted(Path(pages_dir).rglob("*.html"))]
+        club_pages["saved"] = [h for h in saved if "stats_standard_combined" in h]
+        profile_pages["saved"] = [h for h in saved if 'id="bling"' in h or "Scouting Report" in h]
+
+    cases = {}
+    for kind, pages in club_pages.items():
+        if pages:
+            cases[f"find_table_from_page_source[{kind}x{len(pages)}]"] = (
+                lambda pages=pages: [find_table_from_page_source(h, "stats_standard_combined") for h in pages])
+            cases[f"find_tables_from_page_source[{kind}x{len(pages)}]"] = (
+                lambda pages=pages: [find_tables_from_page_source(h, SQUAD_TABLE_IDS.values()) for h in pages])
+    for kind, pages in profile_pages.items():
+        if pages:
+            cases[f"parse_scouting_per90[{kind}x{len(pages)}]"] = (
+                lambda pages=pages: [parse_scouting_per90(h, MIDFIELDER_LABELS) for h in pages])
+            cases[f"extract_profile[{kind}x{len(pages)}]"] = (
+                lambda pages=pages: [extract_profile(h, "midfielder") for h in pages])
+    return cases
+
+
+def table_cases(n: int) -> dict:
+    df = player_table(n)
+    rng = np.random.default_rng(1)
+    numeric_text = pd.Series([f"{v:,.1f}" for v in rng.gamma(2.0, 500.0, n)], dtype=object)
+    fbref_pos = pd.Series(rng.choice(["GK", "DF", "DF,MF", "MF", "MF,FW", "FW"], n), dtype=object)
+
+    prepared = df.copy()
+    prepared["90s Played"] = pd.to_numeric(prepared["90s Played"], errors="coerce")
+    add_role_and_features(prepared)
+    X = feature_frame(prepared, weight_matrix(ROLE_WEIGHTS).index)
+    eligible = prepared["90s Played"] >= MIN_90S
+
+    return {
+        f"maybe_to_numeric[{n}]": lambda: maybe_to_numeric(numeric_text),
+        f"classify_role[{n}]": lambda: fbref_pos.map(classify_role),
+        f"map_role[{n}]": lambda: df["Position"].map(map_role),
+        f"standardize_by_role[{n}]": lambda: standardize_by_role(X, prepared["role"], eligible),
+        f"rank_players[{n}]": lambda: rank_players(df, RankingConfig(min_90s=MIN_90S)),
+        f"market_value_to_eur[{n}]": lambda: df["Market value"].map(market_value_to_eur),
+        f"parse_market_value[{n}]": lambda: parse_market_value(df["Market value"]),
+    }
+
+
+def time_case(fn, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {"min_s": min(times), "median_s": statistics.median(times), "repeat": repeat}
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"timestamp": datetime.now().isoformat(timespec="seconds"), "commit": commit,
+            "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+            "machine": platform.machine(), "platform": platform.platform()}
+
+
+def run(args) -> Path:
+    def wanted(name):
+        return not args.only or any(fnmatch.fnmatch(name, pat) for pat in args.only)
+
+    results = {}
+    groups = [("html", lambda: html_cases(args.pages))] + [(f"{n:,} rows", lambda n=n: table_cases(n))
+                                                         for n in args.sizes]
+    for label, build in groups:
+        cases = {name: fn for name, fn in build().items() if wanted(name)}
+        if not cases:
+            continue
+        print(label)
+        for name, fn in cases.items():
+            fn()  # warm-up: imports, regex compilation, lazy pandas machinery
+            results[name] = time_case(fn, args.repeat)
+            print(f"  {name:<48}{results[name]['min_s']:>10.4f}s")
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"environment": environment(), "results": results}, indent=2))
+    print(f"Saved → {out}")
+    return out
+
+
+def compare(args) -> int:
+    base = json.loads(Path(args.baseline).read_text())["results"]
+    cur = json.loads(Path(args.current).read_text())["results"]
+    regressions = 0
+    print(f"{'case':<48}{'baseline':>11}{'current':>11}{'ratio':>8}")
+    for name in sorted(base.keys() | cur.keys()):
+        if name not in base or name not in cur:
+            print(f"{name:<48}{'only in ' + ('current' if name in cur else 'baseline'):>30}")
+            continue
+        b, c = base[name]["min_s"], cur[name]["min_s"]
+        ratio = c / b if b else float("inf")
+        flag = ""
+        if ratio > 1 + args.tolerance and c - b > args.min_delta:
+            flag, regressions = "  REGRESSION", regressions + 1
+        elif ratio < 1 - args.tolerance:
+            flag = "  faster"
+        print(f"{name:<48}{b:>10.4f}s{c:>10.4f}s{ratio:>7.2f}x{flag}")
+    print(f"{regressions} regression(s) beyond {args.tolerance:.0%}")
+    return 1 if regressions else 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Parsing and ranking benchmarks.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="run the suite and write a JSON result file")
+    r.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    r.add_argument("--repeat", type=int, default=3)
+    r.add_argument("--only", nargs="+", help="glob(s) over case names, e.g. 'rank_players*'")
+    r.add_argument("--pages", help="directory of saved HTML pages to add to the fixtures")
+    r.add_argument("--out", help=f"result file (default {RESULTS_DIR.name}/<timestamp>.json)")
+    c = sub.add_parser("compare", help="compare a result file against a baseline")
+    c.add_argument("baseline")
+    c.add_argument("current")
+    c.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown (0.10 = 10%%)")
+    c.add_argument("--min-delta", type=float, default=0.002,
+                   help="ignore slowdowns smaller than this many seconds (timer noise)")
+    args = ap.parse_args()
+    if args.cmd == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
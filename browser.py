@@ -0,0 +1,53 @@
+# Chrome configuration shared by both scrapers.
+#
+# Only the HTML matters to us, so the lean profile runs headless, returns from
+# driver.get at DOMContentLoaded ("eager") instead of waiting for every subresource,
+# and has Chrome refuse images, fonts, media and the ad/tracker hosts outright.
+
+import subprocess
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+CHROMEDRIVER_PATH = r"C:\Users\Lenovo\Downloads\chromedriver-win64\chromedriver-win64\chromedriver.exe"
+WINDOW_SIZE = (1600, 1000)
+
+BLOCKED_URL_PATTERNS = [
+    # images, fonts and media
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4", "*.webm", "*.mp3",
+    # ads, analytics and tag managers seen on Transfermarkt and FBref
+    "*doubleclick.net*", "*googlesyndication.com*", "*googletagmanager.com*", "*google-analytics.com*",
+    "*googletagservices.com*", "*adservice.google.*", "*amazon-adsystem.com*", "*adnxs.com*",
+    "*criteo.*", "*rubiconproject.com*", "*pubmatic.com*", "*openx.net*", "*casalemedia.com*",
+    "*taboola.com*", "*outbrain.com*", "*scorecardresearch.com*", "*quantserve.com*", "*chartbeat.*",
+    "*hotjar.com*", "*facebook.net*", "*connect.facebook.*", "*twitter.com/widgets*", "*teads.tv*",
+    "*id5-sync.com*", "*prebid*", "*moatads.com*", "*adsafeprotected.com*",
+]
+
+
+def make_driver(headless: bool = True, lean: bool = True) -> webdriver.Chrome:
+    """
+    Chrome for scraping. `lean` adds the eager load strategy and resource blocking;
+    headless=False, lean=False gives the old full-page, visible browser (for debugging).
+    """
+    opts = Options()
+    if headless:
+        opts.add_argument("--headless=new")
+    opts.add_argument("--log-level=3")
+    opts.add_argument(f"--window-size={WINDOW_SIZE[0]},{WINDOW_SIZE[1]}")
+    opts.add_experimental_option("excludeSwitches", ["enable-logging", "enable-automation"])
+    prefs = {"profile.default_content_setting_values.notifications": 2}
+    if lean:
+        opts.page_load_strategy = "eager"
+        prefs["profile.managed_default_content_settings.images"] = 2
+        opts.add_argument("--blink-settings=imagesEnabled=false")
+    opts.add_experimental_option("prefs", prefs)
+
+    service = Service(executable_path=CHROMEDRIVER_PATH, log_output=subprocess.DEVNULL)
+    driver = webdriver.Chrome(service=service, options=opts)
+    if lean:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    return driver
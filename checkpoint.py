@@ -0,0 +1,42 @@
+# Append-only per-player journal for long squad scrapes.
+#
+# Each finished player is written as one JSON line and flushed to disk straight
+# away, so a chromedriver crash loses at most the player in flight. Reopening the
+# journal with resume=True hands back what is already done.
+
+import json
+import os
+
+
+class Journal:
+    """JSON-lines journal keyed by a per-player string; `done` holds the records read on resume."""
+
+    def __init__(self, path, resume: bool = False):
+        self.path = path
+        self.done = {}
+        valid = 0
+        if resume and os.path.exists(path):
+            with open(path, "rb") as fh:
+                for line in fh:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated")
+                        rec = json.loads(line)
+                    except ValueError:
+                        break  # torn last line from a crash: everything before it is intact
+                    self.done[rec["key"]] = rec
+                    valid += len(line)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._fh = open(path, "a" if resume else "w", encoding="utf-8")
+        if resume:
+            self._fh.truncate(valid)  # drop the torn tail so the next record starts on a fresh line
+
+    def append(self, key: str, **record):
+        record["key"] = key
+        self._fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self.done[key] = record
+
+    def close(self):
+        self._fh.close()
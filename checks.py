@@ -0,0 +1,66 @@
+# End-to-end checks of behaviour the datasets depend on, on small frames in a temp directory.
+# Each check raises AssertionError with what went wrong; nothing outside the temp directory is touched.
+# Usage: python checks.py
+
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from crawl import enqueue_league
+from jobqueue import JobQueue
+from mergecsv import load_sources, merge_sources
+from scoring import UNDERRATED_RANK_COLUMNS, RankingConfig, rank_players
+from storage import read_squads, write_parquet
+
+SQUADS_PATH = Path("all_squads.csv")
+
+
+def check_years_days_age(tmp: Path):
+    """FBref's in-season "29-123" ages survive read_squads (CSV and Parquet) and keep underrated ranks."""
+    df = pd.read_csv(SQUADS_PATH, encoding="utf-8-sig")
+    df["age"] = df["age"].map(lambda a: f"{int(a)}-123" if pd.notna(a) else a)
+    for parquet in (False, True):
+        path = tmp / f"squads_{parquet}.csv"
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+        if parquet and not write_parquet(pd.read_csv(path), path.with_suffix(".parquet")):
+            continue
+        read = read_squads(path)
+        assert read["age"].notna().sum() == df["age"].notna().sum(), "years-days ages lost on read"
+        ranked = rank_players(read, RankingConfig(min_90s=20, max_age=30))
+        for role, col in UNDERRATED_RANK_COLUMNS.items():
+            assert ranked[col].notna().any(), f"no {role} underrated ranks with years-days ages"
+
+
+def check_accented_club_merge(tmp: Path):
+    """Squads of clubs with accented names pair up when the crawl names their output files."""
+    clubs = {"Atlético Madrid": ["Jan Oblak", "Julián Álvarez"], "Alavés": ["Carlos Vicente"], "1. FC Köln": ["Timo Hübers"]}
+    queue = JobQueue(tmp / "crawl.db")
+    enqueue_league(queue, {"name": "La Liga"}, 2024, [{"name": c, "url": f"tm/{c}"} for c in clubs],
+                   [{"name": c, "url": f"fbref/{c}"} for c in clubs])
+    out_dir = tmp / "outputs"
+    out_dir.mkdir()
+    while (job := queue.claim("fbref")) is not None:
+        pd.DataFrame({"player": clubs[job["club"]]}).to_csv(out_dir / job["out"], index=False)
+    while (job := queue.claim("transfermarkt")) is not None:
+        players = clubs[job["club"]]
+        pd.DataFrame({"Player": players, "Club": job["club"], "League": job["league"]}).to_csv(
+            out_dir / job["out"], index=False)
+    queue.close()
+    merged, report = merge_sources(*load_sources(out_dir))
+    assert report.empty, f"unmatched after merge:\n{report}"
+    assert len(merged) == sum(map(len, clubs.values()))
+
+
+CHECKS = [check_years_days_age, check_accented_club_merge]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        for check in CHECKS:
+            check(Path(tmp))
+            print("ok", check.__name__)
+
+
+if __name__ == "__main__":
+    main()
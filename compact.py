@@ -0,0 +1,144 @@
+# Memory-compact representation of squad and ranked tables.
+#
+# Most of the 80-odd stat columns are float64 and the role-specific blocks (df_*, mf_*,
+# gk_*, fwd_*) are NaN outside their role. compact_frame() narrows floats to float32
+# where every value survives the round trip, stores mostly-NaN role blocks as sparse
+# float32, turns low-cardinality text into categoricals and splits achievements into
+# tuples of interned trophy tokens. expand_frame() undoes the storage-only parts
+# before anything is written out.
+# Usage: python compact.py [all_squads_ranked.csv]   -> memory report, before and after
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from storage import read_squads
+
+FLOAT32_RTOL = 1e-6          # narrow a column only if no value moves by more than this (relative)
+SPARSE_MIN_NAN = 0.5         # role-block columns at least this NaN go sparse
+CATEGORY_MAX_RATIO = 0.5     # text columns with at most this share of distinct values become categoricals
+ROLE_PREFIXES = ("df_", "mf_", "gk_", "fwd_")
+TOKEN_COLUMNS = ["achievements"]
+TOKEN_SEP = ", "
+
+
+def fits_float32(s: pd.Series) -> bool:
+    x = s.to_numpy(dtype="float64", na_value=np.nan)
+    x32 = x.astype(np.float32).astype(np.float64)
+    finite = np.isfinite(x)
+    if not np.array_equal(np.isnan(x), np.isnan(x32)) or np.any(np.abs(x[finite]) > np.finfo(np.float32).max):
+        return False
+    return bool(np.allclose(x32[finite], x[finite], rtol=FLOAT32_RTOL, atol=0.0))
+
+
+def intern_tokens(s: pd.Series) -> pd.Series:
+    """'2x La Liga Champion, Copa del Rey' -> ('2x La Liga Champion', 'Copa del Rey'), tokens shared."""
+    pool = {}
+
+    def split(v):
+        tokens = v if isinstance(v, tuple) else v.split(TOKEN_SEP) if v else ()
+        return tuple(pool.setdefault(t, sys.intern(t)) for t in tokens)
+
+    # identical lists (often empty) share one tuple as well; missing stays None
+    cache = {}
+    return pd.Series([cache.setdefault(v, split(v)) if isinstance(v, (str, tuple)) else None for v in s.astype(object)],
+                     index=s.index, dtype=object)
+
+
+def compact_frame(df: pd.DataFrame, narrow_floats: bool = True) -> pd.DataFrame:
+    """
+    A compact copy of `df`; values are unchanged up to FLOAT32_RTOL. With narrow_floats=False
+    floats stay float64 (role blocks still go sparse), so nothing computed from it moves at all.
+    """
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if col in TOKEN_COLUMNS:
+            out[col] = intern_tokens(s)
+        elif pd.api.types.is_float_dtype(s):
+            dtype = np.float32 if narrow_floats and fits_float32(s) else np.float64
+            if col.startswith(ROLE_PREFIXES) and s.isna().mean() >= SPARSE_MIN_NAN:
+                out[col] = s.astype(pd.SparseDtype(dtype, np.nan))
+            else:
+                out[col] = s.astype(dtype)
+        elif isinstance(s.dtype, pd.CategoricalDtype):
+            out[col] = s.cat.remove_unused_categories()
+        elif s.dtype == object or pd.api.types.is_string_dtype(s):
+            n_unique = s.nunique(dropna=True)
+            out[col] = s.astype("category") if n_unique <= CATEGORY_MAX_RATIO * max(len(s), 1) else s
+        else:
+            out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def expand_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Dense columns and joined achievement strings again, e.g. before to_csv or write_parquet."""
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, pd.SparseDtype):
+            s = s.sparse.to_dense()
+        if col in TOKEN_COLUMNS:
+            s = s.map(lambda t: TOKEN_SEP.join(t) if isinstance(t, tuple) else t, na_action="ignore").astype("string")
+        out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def _object_bytes(values) -> int:
+    """Deep size of an object column, counting every shared object (interned token, tuple) once."""
+    seen, total = set(), 0
+    stack = list(values)
+    while stack:
+        v = stack.pop()
+        if id(v) in seen:
+            continue
+        seen.add(id(v))
+        total += sys.getsizeof(v)
+        if isinstance(v, tuple):
+            stack.extend(v)
+    return total + 8 * len(values)   # the column's own pointer array
+
+
+def frame_bytes(df: pd.DataFrame) -> dict:
+    """Bytes per column, deep, with shared Python objects counted once."""
+    sizes = {}
+    for col in df.columns:
+        s = df[col]
+        sizes[col] = _object_bytes(s.to_numpy()) if s.dtype == object else int(s.memory_usage(index=False, deep=True))
+    return sizes
+
+
+def _kind(s: pd.Series) -> str:
+    if isinstance(s.dtype, pd.SparseDtype):
+        return f"sparse[{s.dtype.subtype}]"
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return "category"
+    return str(s.dtype)
+
+
+def memory_report(df: pd.DataFrame, label: str = "") -> int:
+    """Print total and per-dtype memory of `df`; returns the total in bytes."""
+    sizes = frame_bytes(df)
+    total = sum(sizes.values())
+    by_kind = {}
+    for col, n in sizes.items():
+        k = _kind(df[col])
+        cols, b = by_kind.get(k, (0, 0))
+        by_kind[k] = (cols + 1, b + n)
+    print(f"{label or 'frame'}: {len(df):,} rows x {len(df.columns)} columns, {total / 1e6:.2f} MB")
+    for k, (cols, b) in sorted(by_kind.items(), key=lambda kv: -kv[1][1]):
+        print(f"  {k:<20}{cols:>5} cols{b / 1e6:>10.2f} MB")
+    return total
+
+
+def main(path="all_squads_ranked.csv"):
+    df = read_squads(Path(path))
+    before = memory_report(df, "as read")
+    after = memory_report(compact_frame(df), "compact")
+    print(f"Saved {1 - after / before:.0%} ({(before - after) / 1e6:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,142 @@
+# Discover every club's squad URL from the league pages and queue the scrape jobs.
+#
+# For each league in leagues.json the Transfermarkt and FBref league tables are
+# read, the two club lists are paired by name (FBref's name is kept for both so
+# mergecsv.py can join the outputs), and one job per club and source goes into
+# the SQLite queue. The scrapers then drain it:
+#   python crawl.py                                   # discover + enqueue
+#   python scrapetransfermarket.py --queue crawl.db --workers 4
+#   python scrapefbref.py --queue crawl.db
+#   python mergecsv.py --season 2024                  # joins outputs/season=2024/
+# Usage: python crawl.py [--config leagues.json] [--season 2024] [--queue crawl.db] [--league "La Liga" ...]
+
+import argparse
+import re
+
+from lxml import html as lxml_html
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from browser import make_driver
+from jobqueue import QUEUE_PATH, JobQueue
+from leagues import (CONFIG_PATH, fbref_league_url, fbref_squad_url, load_config, tm_league_url,
+                     tm_squad_url)
+from mergecsv import club_key, match_players, normalize_name
+from pagecache import PageCache
+from scrapefbref import slugify
+from scrapetransfermarket import accept_popup
+
+CACHE_DIR = "cache/pages"
+CLUB_MIN_SCORE = 0.5   # club names differ more than player names ("Man City" / "Manchester City")
+
+_TM_CLUB_HREF = re.compile(r"^/([^/]+)/startseite/verein/(\d+)")
+_FBREF_SQUAD_HREF = re.compile(r"^/en/squads/([0-9a-f]{8})/(?:[^/]+/)?([^/]+)-Stats$")
+# club-name words that carry no identity ("FC Barcelona" vs "Barcelona")
+_CLUB_NOISE = {"fc", "cf", "afc", "ac", "as", "sc", "ssc", "us", "sv", "vfb", "vfl", "tsg", "rc", "ogc", "losc",
+               "club", "de", "calcio", "1"}
+
+
+def discover_tm_clubs(html: str, season: int) -> list[dict]:
+    """Clubs of a Transfermarkt league page: [{"name", "url"}] in table order."""
+    tree = lxml_html.fromstring(html)
+    clubs, seen = [], set()
+    for a in tree.xpath("//table[contains(concat(' ', normalize-space(@class), ' '), ' items ')]"
+                        "//td[contains(@class, 'hauptlink')]//a[@href]"):
+        m = _TM_CLUB_HREF.match(a.get("href"))
+        if not m or m.group(2) in seen:
+            continue
+        seen.add(m.group(2))
+        name = a.get("title") or " ".join(a.text_content().split())
+        clubs.append({"name": name, "url": tm_squad_url(m.group(1), m.group(2), season)})
+    return clubs
+
+
+def discover_fbref_clubs(html: str, season: int) -> list[dict]:
+    """Clubs of an FBref league page (the league table), with all-competitions squad URLs."""
+    tree = lxml_html.fromstring(html)
+    clubs, seen = [], set()
+    for a in tree.xpath("//table[starts-with(@id, 'results')]//td[@data-stat='team']//a[@href]"):
+        m = _FBREF_SQUAD_HREF.match(a.get("href"))
+        if not m or m.group(1) in seen:
+            continue
+        seen.add(m.group(1))
+        clubs.append({"name": " ".join(a.text_content().split()), "url": fbref_squad_url(m.group(1), m.group(2), season)})
+    return clubs
+
+
+def _club_name_key(name: str) -> str:
+    return " ".join(t for t in normalize_name(name).split() if t not in _CLUB_NOISE)
+
+
+def pair_clubs(tm_clubs: list[dict], fb_clubs: list[dict]) -> list[tuple[dict | None, dict | None]]:
+    """Pair the two sources' clubs by name; unpaired clubs come back with None on the other side."""
+    matches = match_players([("", _club_name_key(c["name"])) for c in fb_clubs],
+                            [("", _club_name_key(c["name"])) for c in tm_clubs], min_score=CLUB_MIN_SCORE)
+    pairs = [(tm_clubs[matches[i][0]] if i in matches else None, fb) for i, fb in enumerate(fb_clubs)]
+    used = {j for j, _, _ in matches.values()}
+    pairs += [(tm, None) for j, tm in enumerate(tm_clubs) if j not in used]
+    return pairs
+
+
+def fetch(driver, url: str, cache: PageCache, wait_xpath: str) -> str:
+    html = cache.get(url)
+    if html is None:
+        driver.get(url)
+        if "transfermarkt" in url:
+            accept_popup(driver)
+        WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.XPATH, wait_xpath)))
+        html = driver.page_source
+        cache.put(url, html)
+    return html
+
+
+def enqueue_league(queue: JobQueue, league: dict, season: int, tm_clubs: list[dict], fb_clubs: list[dict]) -> int:
+    added = 0
+    for tm, fb in pair_clubs(tm_clubs, fb_clubs):
+        name = (fb or tm)["name"]
+        if tm is None or fb is None:
+            print(f"  {name}: only on {'FBref' if tm is None else 'Transfermarkt'} — queued, but it will not merge")
+        if tm is not None:
+            added += queue.enqueue("transfermarkt", season, league["name"], name, tm["url"],
+                                   f"{club_key(name)}transfermarket.csv")
+        if fb is not None:
+            added += queue.enqueue("fbref", season, league["name"], name, fb["url"], f"{slugify(name)}_fbref.csv")
+    return added
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Discover league squads and queue the scrape jobs.")
+    ap.add_argument("--config", default=CONFIG_PATH, help="league/season config (JSON)")
+    ap.add_argument("--season", type=int, help="season start year, overrides the config (2024 = 2024/25)")
+    ap.add_argument("--queue", default=QUEUE_PATH, help="SQLite job queue file")
+    ap.add_argument("--league", action="append", help="only these leagues (repeatable)")
+    args = ap.parse_args()
+
+    conf = load_config(args.config, args.season)
+    season = conf["season"]
+    leagues = [lg for lg in conf["leagues"] if not args.league or lg["name"] in args.league]
+
+    driver = make_driver()
+    cache = PageCache(CACHE_DIR)
+    queue = JobQueue(args.queue)
+    try:
+        for league in leagues:
+            tm_clubs, fb_clubs = [], []
+            if league["tm_path"]:
+                tm_clubs = discover_tm_clubs(
+                    fetch(driver, tm_league_url(league, season), cache, "//table[contains(@class, 'items')]"), season)
+            if league["fbref_comp"]:
+                fb_clubs = discover_fbref_clubs(
+                    fetch(driver, fbref_league_url(league, season), cache, "//table[starts-with(@id, 'results')]"),
+                    season)
+            added = enqueue_league(queue, league, season, tm_clubs, fb_clubs)
+            print(f"{league['name']}: {len(tm_clubs)} Transfermarkt / {len(fb_clubs)} FBref clubs, {added} new jobs")
+    finally:
+        driver.quit()
+    print("Queue:", queue.counts())
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
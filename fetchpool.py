@@ -0,0 +1,154 @@
+# Pooled browser workers for fetching many pages concurrently.
+
+import queue
+import threading
+import time
+from urllib.parse import urlparse
+
+import metrics
+
+
+# Text of the pages sites serve instead of content when they throttle a client.
+RATE_LIMIT_MARKERS = ("rate limited request", "too many requests", "429 error", "you have been rate limited")
+MAX_THROTTLE_RETRIES = 5
+
+
+def is_rate_limited(html: str) -> bool:
+    head = html[:20000].lower()  # the block pages are tiny; real pages say nothing of the sort up top
+    return any(m in head for m in RATE_LIMIT_MARKERS)
+
+
+class HostRateLimiter:
+    """
+    Per-host token bucket shared by every worker thread, adapting to what the site tolerates.
+    Each clean page nudges the host's rate up (to `max_per_sec` at most); a rate-limit page
+    halves it and blocks the host for an exponentially growing backoff.
+    """
+
+    def __init__(self, per_sec: float, max_per_sec: float | None = None, min_per_sec: float = 0.05,
+                 burst: float = 1.0, step: float = 0.05, base_backoff: float = 5.0, max_backoff: float = 300.0):
+        self.start_rate = per_sec
+        self.max_rate = max_per_sec or per_sec
+        self.min_rate = min_per_sec
+        self.burst = burst
+        self.step = step
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url: str) -> dict:
+        host = urlparse(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = {"rate": self.start_rate, "tokens": self.burst, "last": time.monotonic(),
+                                 "blocked_until": 0.0, "backoff": 0.0,
+                                 "requests": 0, "throttled": 0, "delay_s": 0.0}
+        return self._hosts[host]
+
+    def wait(self, url: str) -> float:
+        """Block until `url`'s host has a token (and is out of backoff); return the seconds slept."""
+        if not self.start_rate:
+            return 0.0
+        with self._lock:
+            h = self._host(url)
+            now = time.monotonic()
+            h["tokens"] = min(self.burst, h["tokens"] + (now - h["last"]) * h["rate"])
+            h["last"] = now
+            h["tokens"] -= 1.0  # reserve now; a negative balance queues later callers behind us
+            delay = max(-h["tokens"] / h["rate"], h["blocked_until"] - now, 0.0)
+            h["requests"] += 1
+            h["delay_s"] += delay
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def feedback(self, url: str, html: str) -> bool:
+        """Adapt to the page just fetched; returns True if it was a rate-limit page (retry it)."""
+        throttled = is_rate_limited(html)
+        with self._lock:
+            h = self._host(url)
+            if throttled:
+                h["throttled"] += 1
+                h["backoff"] = min(self.max_backoff, h["backoff"] * 2 or self.base_backoff)
+                h["blocked_until"] = time.monotonic() + h["backoff"]
+                h["rate"] = max(self.min_rate, h["rate"] / 2)
+                h["tokens"] = min(h["tokens"], 0.0)
+            else:
+                h["backoff"] = 0.0
+                h["rate"] = min(self.max_rate, h["rate"] + self.step)
+        return throttled
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {host: {"requests": h["requests"], "throttled": h["throttled"],
+                           "delay_s": round(h["delay_s"], 2), "rate_per_sec": round(h["rate"], 3)}
+                    for host, h in self._hosts.items()}
+
+
+def fetch_limited(driver, url: str, load_page, limiter: HostRateLimiter | None,
+                  retries: int = MAX_THROTTLE_RETRIES) -> str:
+    """`load_page(driver, url)` paced by `limiter`, retrying (after its backoff) while the site throttles."""
+    for _ in range(retries + 1):
+        if limiter is not None:
+            with metrics.span("rate_limit_wait"):
+                limiter.wait(url)
+        with metrics.span("page_load"):
+            html = load_page(driver, url)
+        metrics.incr("pages_fetched")
+        if limiter is None or not limiter.feedback(url, html):
+            return html
+        metrics.incr("rate_limited_pages")
+    raise RuntimeError(f"Still rate limited after {retries} retries: {url}")
+
+
+def fetch_pages(urls, make_driver, load_page, workers: int = 4, max_per_sec: float = 1.0,
+                limiter: HostRateLimiter | None = None, on_page=None) -> list[str]:
+    """
+    Fetch `urls` with a pool of `workers` drivers pulling from one shared queue.
+    `make_driver()` builds a driver per worker, `load_page(driver, url)` returns its HTML.
+    Results come back in the order of `urls`; duplicate URLs are fetched once.
+    Pass a long-lived `limiter` to keep its learned rates across calls.
+    `on_page(url, html)` is called as each page arrives (one call at a time), so callers
+    can cache and checkpoint it before the rest are done; if a worker fails, the pages
+    already handed to it are kept there and the error is raised once the pool stops.
+    """
+    unique = list(dict.fromkeys(u for u in urls if u))
+    jobs = queue.Queue()
+    for url in unique:
+        jobs.put(url)
+
+    limiter = limiter or HostRateLimiter(max_per_sec)
+    pages, errors = {}, []
+    lock = threading.Lock()
+
+    def worker():
+        driver = None
+        try:
+            while not errors:
+                try:
+                    url = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                if driver is None:
+                    driver = make_driver()
+                html = fetch_limited(driver, url, load_page, limiter)
+                with lock:
+                    pages[url] = html
+                    if on_page is not None:
+                        on_page(url, html)
+        except Exception as exc:
+            with lock:
+                errors.append(exc)
+        finally:
+            if driver is not None:
+                driver.quit()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, min(workers, len(unique))))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if errors:
+        raise errors[0]
+    return [pages.get(u, "") for u in urls]
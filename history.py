@@ -0,0 +1,184 @@
+# Multi-season history of the squad and ranked tables.
+#
+# Each season's table is stored split by league and club, one file per partition:
+#   history/<kind>/season=2024/league=la_liga/club=barcelona/part.parquet   (part.csv without pyarrow)
+# A query for a season, league or club lists and reads only the matching directories.
+# season_deltas() joins two seasons on a player index (normalized name + nation) and
+# reports market-value, score and rank changes.
+# Usage:
+#   python history.py store ranked --season 2024 [--path all_squads_ranked.csv]
+#   python history.py show ranked [--season 2024] [--league "La Liga"] [--club Arsenal]
+#   python history.py deltas 2023 2024 [--out season_deltas.csv]
+
+import argparse
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from leagues import SEASON
+from mergecsv import normalize_name
+from scoring import RANK_COLUMNS, SCORE_COLUMNS
+from storage import HAVE_PARQUET, read_squads, write_parquet
+
+HISTORY_DIR = Path("history")
+SOURCES = {"squads": Path("all_squads.csv"), "ranked": Path("all_squads_ranked.csv")}
+PART_NAME = "part.csv"     # read_squads() prefers its .parquet sibling
+DELTAS_PATH = Path("season_deltas.csv")
+UNKNOWN = "unknown"
+
+# what season_deltas() reads from each season's partitions
+DELTA_COLUMNS = (["player", "nation", "Club", "League", "role", "age", "_market_value_eur"]
+                 + list(SCORE_COLUMNS.values()) + list(RANK_COLUMNS.values()))
+
+
+def part_slug(value) -> str:
+    slug = normalize_name(value).replace(" ", "_")
+    return slug or UNKNOWN
+
+
+def partition_dir(kind: str, season: int, league, club, root=HISTORY_DIR) -> Path:
+    return Path(root) / kind / f"season={season}" / f"league={part_slug(league)}" / f"club={part_slug(club)}"
+
+
+def write_season(df: pd.DataFrame, kind: str, season: int, root=HISTORY_DIR) -> int:
+    """Replace `season` of `kind` with `df`, one partition per league and club; returns the partition count."""
+    season_dir = Path(root) / kind / f"season={season}"
+    staging = season_dir.with_name(season_dir.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    league = df["League"] if "League" in df.columns else pd.Series(UNKNOWN, index=df.index)
+    club = df["Club"] if "Club" in df.columns else pd.Series(UNKNOWN, index=df.index)
+    parts = 0
+    for (lg, cl), rows in df.groupby([league.astype(object).fillna(UNKNOWN), club.astype(object).fillna(UNKNOWN)],
+                                     sort=False):
+        out = staging / f"league={part_slug(lg)}" / f"club={part_slug(cl)}"
+        out.mkdir(parents=True, exist_ok=True)
+        if HAVE_PARQUET:
+            write_parquet(rows, out / Path(PART_NAME).with_suffix(".parquet"))
+        else:
+            rows.to_csv(out / PART_NAME, index=False, encoding="utf-8-sig")
+        parts += 1
+    # swap the whole season in at once so readers never see half of it
+    shutil.rmtree(season_dir, ignore_errors=True)
+    staging.rename(season_dir)
+    return parts
+
+
+def _matching(parent: Path, key: str, value) -> list[Path]:
+    if not parent.is_dir():
+        return []
+    if value is None:
+        return sorted(p for p in parent.iterdir() if p.is_dir() and p.name.startswith(f"{key}=")
+                      and not p.name.endswith(".tmp"))
+    path = parent / f"{key}={value}"
+    return [path] if path.is_dir() else []
+
+
+def partitions(kind: str, season: int | None = None, league=None, club=None, root=HISTORY_DIR) -> list[Path]:
+    """Partition directories of `kind` matching the filters; only the directories on the way are listed."""
+    out = []
+    for s in _matching(Path(root) / kind, "season", season):
+        for lg in _matching(s, "league", None if league is None else part_slug(league)):
+            out += _matching(lg, "club", None if club is None else part_slug(club))
+    return out
+
+
+def read_history(kind: str = "ranked", season: int | None = None, league=None, club=None,
+                 columns: list[str] | None = None, root=HISTORY_DIR) -> pd.DataFrame:
+    """The stored rows matching the filters, with an int `season` column."""
+    frames = []
+    for part in partitions(kind, season, league, club, root):
+        df = read_squads(part / PART_NAME, columns=columns)
+        df.insert(0, "season", int(part.parent.parent.name.split("=", 1)[1]))
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=["season"] + list(columns or []))
+    return pd.concat(frames, ignore_index=True)
+
+
+def player_index(df: pd.DataFrame) -> pd.DataFrame:
+    """`df` indexed by normalized name + nation; names that are not unique in the season are dropped."""
+    nation = df["nation"].astype(object).fillna("") if "nation" in df.columns else ""
+    key = df["player"].map(normalize_name) + "|" + nation
+    df = df.set_index(key.rename("player_key"))
+    return df[~df.index.duplicated(keep=False)].sort_index()
+
+
+def _own_role(df: pd.DataFrame, columns: dict) -> pd.Series:
+    """Each row's value in its own role's column (score or rank)."""
+    out = pd.Series(np.nan, index=df.index)
+    for role, col in columns.items():
+        if col in df.columns:
+            rows = (df["role"] == role).to_numpy()
+            out[rows] = pd.to_numeric(df.loc[rows, col], errors="coerce")
+    return out
+
+
+def season_deltas(season_from: int, season_to: int, league=None, club=None, root=HISTORY_DIR) -> pd.DataFrame:
+    """
+    Players ranked in both seasons with their market value, role score and role rank in each
+    and the change. `league`/`club` filter the later season; the earlier one is read whole
+    (players move clubs). Score and rank deltas need the same role in both seasons.
+    """
+    a = player_index(read_history("ranked", season_from, columns=DELTA_COLUMNS, root=root))
+    b = player_index(read_history("ranked", season_to, league, club, columns=DELTA_COLUMNS, root=root))
+    for df in (a, b):
+        df["score"] = _own_role(df, SCORE_COLUMNS)
+        df["rank"] = _own_role(df, RANK_COLUMNS)
+    keep = ["player", "Club", "League", "role", "age", "_market_value_eur", "score", "rank"]
+    joined = b[keep].join(a[keep], how="inner", lsuffix="_to", rsuffix="_from")
+
+    out = pd.DataFrame({"player": joined["player_to"], "season_from": season_from, "season_to": season_to})
+    for col in ["Club", "League", "role", "age"]:
+        out[f"{col.lower()}_from"] = joined[f"{col}_from"]
+        out[f"{col.lower()}_to"] = joined[f"{col}_to"]
+    mv_from, mv_to = joined["_market_value_eur_from"].astype(float), joined["_market_value_eur_to"].astype(float)
+    out["mv_from"], out["mv_to"], out["mv_delta"] = mv_from, mv_to, mv_to - mv_from
+    out["mv_pct"] = (mv_to / mv_from - 1.0).where(mv_from > 0)
+    same_role = (joined["role_from"].astype(object) == joined["role_to"].astype(object)).to_numpy()
+    for m in ["score", "rank"]:
+        out[f"{m}_from"], out[f"{m}_to"] = joined[f"{m}_from"], joined[f"{m}_to"]
+        out[f"{m}_delta"] = (joined[f"{m}_to"] - joined[f"{m}_from"]).where(same_role)
+    return out.reset_index(drop=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Season-partitioned history of the squad and ranked tables.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    st = sub.add_parser("store", help="store a table as one season (replacing that season)")
+    st.add_argument("kind", choices=list(SOURCES))
+    st.add_argument("--season", type=int, default=SEASON)
+    st.add_argument("--path", help="table to store (default: all_squads.csv / all_squads_ranked.csv)")
+    sh = sub.add_parser("show", help="print the stored rows matching the filters")
+    sh.add_argument("kind", choices=list(SOURCES))
+    sh.add_argument("--season", type=int)
+    sh.add_argument("--league")
+    sh.add_argument("--club")
+    de = sub.add_parser("deltas", help="market-value and score changes between two seasons")
+    de.add_argument("season_from", type=int)
+    de.add_argument("season_to", type=int)
+    de.add_argument("--league")
+    de.add_argument("--club")
+    de.add_argument("--out", default=DELTAS_PATH)
+    ap.add_argument("--root", default=HISTORY_DIR, help="history directory")
+    args = ap.parse_args()
+
+    if args.cmd == "store":
+        path = Path(args.path) if args.path else SOURCES[args.kind]
+        parts = write_season(read_squads(path), args.kind, args.season, args.root)
+        print(f"Stored {path} as {args.kind} season {args.season}: {parts} partitions under {args.root}")
+    elif args.cmd == "show":
+        df = read_history(args.kind, args.season, args.league, args.club, root=args.root)
+        print(df.groupby(["season", "League", "Club"], observed=True).size().to_string() if len(df) else "No rows")
+    else:
+        out = season_deltas(args.season_from, args.season_to, args.league, args.club, args.root)
+        out.to_csv(args.out, index=False, encoding="utf-8-sig")
+        print(f"{len(out)} players in both seasons → {args.out}")
+        if len(out):
+            cols = ["player", "club_to", "role_to", "mv_delta", "mv_pct", "score_delta", "rank_delta"]
+            print("\nBiggest market-value risers:\n", out.nlargest(10, "mv_delta")[cols].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# Incremental re-ranking from per-role running statistics.
+#
+# The z-scores only need, per role and feature, the count, sum and sum of squares
+# over eligible rows. Upserting or deleting a player adjusts those sums, and only
+# the roles whose sums moved get their scores recomputed and re-ranked; a change
+# that leaves every role's statistics alone (e.g. a player under the 90s floor)
+# only rescores that row and re-ranks its role.
+# Usage: python incremental.py UPDATES.csv [--delete KEYS.csv]
+
+import argparse
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from leagues import SEASON, season_end
+from scoring import (MARKET_VALUE_CANDIDATES, RANK_COLUMNS, ROLE_WEIGHTS, ROLES, SCORE_COLUMNS, UNDERRATED_COLUMNS,
+                     UNDERRATED_RANK_COLUMNS, add_role_and_features, feature_frame, rank_roles,
+                     weight_matrix)
+from storage import read_squads, write_parquet
+from tmparse import add_parsed_columns
+
+MIN_90S = 20
+MAX_AGE = 30   # as rankingplayers.py: underrated ranks for FBref-listed under-30s only
+KEY = ["player", "Club"]
+IN_PATH = Path("all_squads.csv")
+OUT_PATH = Path("all_squads_ranked.csv")
+STATE_PATH = Path("all_squads_ranked.state.pkl")
+
+
+class RoleStats:
+    """Count, sum and sum of squares of each feature over a role's eligible rows (NaNs skipped)."""
+
+    def __init__(self, n_features: int):
+        self.n = np.zeros(n_features)
+        self.s = np.zeros(n_features)
+        self.ss = np.zeros(n_features)
+
+    def add(self, X: np.ndarray, sign: float = 1.0):
+        present = ~np.isnan(X)
+        vals = np.where(present, X, 0.0)
+        self.n += sign * present.sum(axis=0)
+        self.s += sign * vals.sum(axis=0)
+        self.ss += sign * (vals * vals).sum(axis=0)
+
+    def mean_std(self) -> tuple[np.ndarray, np.ndarray]:
+        """Mean and population std; std is NaN where it is undefined or ~0 (z-score of 0)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            n = np.where(self.n > 0, self.n, np.nan)
+            mu = self.s / n
+            sd = np.sqrt(np.maximum(self.ss / n - mu * mu, 0.0))
+        sd[np.isclose(sd, 0.0) | np.isnan(sd)] = np.nan
+        return mu, sd
+
+
+class IncrementalRanker:
+    """
+    Ranked view of a squad table that absorbs row upserts/deletes without a full recompute.
+    Rows are keyed by `key` (player + club by default).
+    """
+
+    def __init__(self, df: pd.DataFrame, min_90s: float = MIN_90S, weights: dict = ROLE_WEIGHTS,
+                 key: list[str] = KEY, max_age: int | None = MAX_AGE, ref_date: str = season_end(SEASON)):
+        self.min_90s = min_90s
+        self.max_age = max_age
+        self.ref_date = ref_date
+        self.key = list(key)
+        self.W = weight_matrix(weights)
+        self.df = self._prepare(df)
+        self.rebuild_stats()
+        self._rescore_roles(ROLES)
+        self.age_column = "age" if "age" in self.df.columns else "_age_at_ref"   # as rank_players()
+        rank_roles(self.df, self.min_90s, ROLES, max_age=self.max_age, age_column=self.age_column)
+        self.last_refresh = {"rescored_roles": list(ROLES), "rescored_rows": len(self.df), "reranked_roles": list(ROLES)}
+
+    def _prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        """The columns rank_players() adds, in its order, with the score and rank columns still empty."""
+        df = df.copy()
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype(object)
+        df["90s Played"] = pd.to_numeric(df["90s Played"], errors="coerce")
+        add_role_and_features(df)
+        for col in list(SCORE_COLUMNS.values()) + list(RANK_COLUMNS.values()):
+            df[col] = np.nan
+        mv_col = next((c for c in MARKET_VALUE_CANDIDATES if c in df.columns), "Market value")
+        add_parsed_columns(df, self.ref_date, mv_col=mv_col)
+        df.loc[~(df["_market_value_eur"] > 0), "_market_value_eur"] = np.nan
+        for col in list(UNDERRATED_COLUMNS.values()) + list(UNDERRATED_RANK_COLUMNS.values()):
+            df[col] = np.nan
+        return df.set_index(self.key, drop=False)
+
+    def _features(self, rows: pd.DataFrame) -> np.ndarray:
+        return feature_frame(rows, self.W.index).to_numpy()
+
+    def _eligible(self, rows: pd.DataFrame) -> np.ndarray:
+        return (rows["role"].isin(ROLES) & (rows["90s Played"] >= self.min_90s)).to_numpy()
+
+    def rebuild_stats(self):
+        """Recompute the running sums from scratch (also clears accumulated rounding drift)."""
+        self.stats = {role: RoleStats(len(self.W.index)) for role in ROLES}
+        X, elig, role = self._features(self.df), self._eligible(self.df), self.df["role"].to_numpy()
+        for r in ROLES:
+            self.stats[r].add(X[elig & (role == r)])
+
+    def _score_rows(self, rows: pd.DataFrame, role: str) -> np.ndarray:
+        mu, sd = self.stats[role].mean_std()
+        z = (self._features(rows) - mu) / sd
+        z[~self._eligible(rows)] = 0.0
+        z = np.nan_to_num(z, nan=0.0)
+        return z @ self.W[role].to_numpy()
+
+    def _rescore_roles(self, roles):
+        for role in roles:
+            rows = (self.df["role"] == role).to_numpy()
+            self.df.loc[rows, SCORE_COLUMNS[role]] = self._score_rows(self.df[rows], role)
+
+    def _account(self, rows: pd.DataFrame, sign: float) -> set[str]:
+        """Add (sign=+1) or remove (-1) the eligible `rows` from the running sums; return roles touched."""
+        touched = set()
+        elig = self._eligible(rows)
+        if not elig.any():
+            return touched
+        X = self._features(rows)
+        role = rows["role"].to_numpy()
+        for r in set(role[elig]):
+            self.stats[r].add(X[elig & (role == r)], sign)
+            touched.add(r)
+        return touched
+
+    def apply(self, upserts: pd.DataFrame | None = None, deletes=None) -> pd.DataFrame:
+        """
+        Upsert full rows (same columns as all_squads) and delete rows by key tuple, then
+        rescore and re-rank only what the change can affect. Returns the ranked frame.
+        """
+        stat_roles, row_roles, changed_keys = set(), set(), []
+
+        for key in deletes or []:
+            key = tuple(key) if isinstance(key, (list, tuple)) else (key,)
+            if key not in self.df.index:
+                continue
+            old = self.df.loc[[key]]
+            stat_roles |= self._account(old, -1.0)
+            row_roles |= set(old["role"].dropna())
+            self.df = self.df.drop(index=[key])
+
+        if upserts is not None and len(upserts):
+            new = self._prepare(upserts)
+            existing = new.index.isin(self.df.index)
+            # replaced rows keep their place, new ones go last: the order a full recompute of the merged table gives
+            order = self.df.index.append(new.index[~existing])
+            if existing.any():
+                old = self.df.loc[new.index[existing]]
+                stat_roles |= self._account(old, -1.0)
+                row_roles |= set(old["role"].dropna())
+                self.df = self.df.drop(index=new.index[existing])
+            stat_roles |= self._account(new, +1.0)
+            row_roles |= set(new["role"].dropna())
+            self.df = pd.concat([self.df, new.reindex(columns=self.df.columns)]).loc[order]
+            changed_keys = list(new.index)
+
+        self._rescore_roles([r for r in ROLES if r in stat_roles])
+        rescored_rows = int(self.df["role"].isin(stat_roles).sum())
+        for role in ROLES:
+            if role in stat_roles or role not in row_roles:
+                continue
+            # this role's statistics did not move: only the changed rows need a score
+            rows = self.df.loc[changed_keys]
+            rows = rows[rows["role"] == role]
+            self.df.loc[rows.index, SCORE_COLUMNS[role]] = self._score_rows(rows, role)
+            rescored_rows += len(rows)
+
+        rerank = [r for r in ROLES if r in stat_roles | row_roles]
+        rank_roles(self.df, self.min_90s, rerank, max_age=self.max_age, age_column=self.age_column)
+        self.last_refresh = {"rescored_roles": [r for r in ROLES if r in stat_roles],
+                             "rescored_rows": rescored_rows, "reranked_roles": rerank}
+        return self.ranked()
+
+    def ranked(self) -> pd.DataFrame:
+        return self.df.reset_index(drop=True)
+
+    def save(self, path=STATE_PATH):
+        with open(path, "wb") as fh:
+            pickle.dump(self, fh)
+
+    @staticmethod
+    def load(path=STATE_PATH) -> "IncrementalRanker":
+        with open(path, "rb") as fh:
+            return pickle.load(fh)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Apply player upserts/deletes to the ranking incrementally.")
+    ap.add_argument("updates", nargs="?", help="CSV of full player rows to insert or replace")
+    ap.add_argument("--delete", metavar="KEYS_CSV", help=f"CSV with {'/'.join(KEY)} columns of rows to drop")
+    args = ap.parse_args()
+
+    if STATE_PATH.exists():
+        ranker = IncrementalRanker.load(STATE_PATH)
+    else:
+        ranker = IncrementalRanker(read_squads(IN_PATH))
+    upserts = read_squads(args.updates) if args.updates else None
+    deletes = (pd.read_csv(args.delete)[KEY].itertuples(index=False, name=None) if args.delete else None)
+
+    df = ranker.apply(upserts, list(deletes) if deletes is not None else None)
+    print("Refresh:", ranker.last_refresh)
+    df.to_csv(OUT_PATH, index=False, encoding="utf-8-sig")
+    write_parquet(df, OUT_PATH.with_suffix(".parquet"))
+    ranker.save(STATE_PATH)
+    print("Saved:", OUT_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Durable crawl queue in a local SQLite file.
+#
+# crawl.py enqueues one job per (source, squad URL); the scrapers' workers claim
+# jobs one at a time and mark them done or failed. Everything lives on disk, so a
+# crawl can be stopped, inspected (`python jobqueue.py crawl.db`) and resumed, and
+# several worker processes can drain the same file.
+
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+QUEUE_PATH = Path("crawl.db")
+MAX_ATTEMPTS = 3   # a job that fails this many times stays 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id       INTEGER PRIMARY KEY,
+    source   TEXT NOT NULL,               -- 'transfermarkt' | 'fbref'
+    season   INTEGER NOT NULL,
+    league   TEXT NOT NULL,
+    club     TEXT NOT NULL,
+    url      TEXT NOT NULL,
+    out      TEXT NOT NULL,               -- CSV file name under outputs/season=<season>/
+    status   TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    rows     INTEGER,
+    error    TEXT NOT NULL DEFAULT '',
+    updated  REAL NOT NULL,
+    UNIQUE (source, url)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (source, status, id);
+"""
+
+
+class JobQueue:
+    def __init__(self, path=QUEUE_PATH, max_attempts: int = MAX_ATTEMPTS):
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        # autocommit; claims take the write lock explicitly with BEGIN IMMEDIATE
+        self._db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def enqueue(self, source: str, season: int, league: str, club: str, url: str, out: str) -> bool:
+        """Add a job; returns False if this (source, url) is already queued."""
+        cur = self._db.execute(
+            "INSERT OR IGNORE INTO jobs (source, season, league, club, url, out, updated) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (source, season, league, club, url, out, time.time()),
+        )
+        return cur.rowcount == 1
+
+    def claim(self, source: str) -> dict | None:
+        """Atomically take the oldest pending job of `source` and mark it running."""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute(
+                "SELECT * FROM jobs WHERE source = ? AND status = 'pending' ORDER BY id LIMIT 1", (source,)
+            ).fetchone()
+            if row is not None:
+                self._db.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated = ? WHERE id = ?",
+                    (time.time(), row["id"]),
+                )
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        return dict(row) if row is not None else None
+
+    def done(self, job_id: int, rows: int):
+        self._db.execute("UPDATE jobs SET status = 'done', rows = ?, error = '', updated = ? WHERE id = ?",
+                         (rows, time.time(), job_id))
+
+    def fail(self, job_id: int, error: str):
+        """Record the error; the job goes back to pending until it has used up its attempts."""
+        self._db.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,"
+            " error = ?, updated = ? WHERE id = ?",
+            (self.max_attempts, error, time.time(), job_id),
+        )
+
+    def requeue_running(self, source: str | None = None) -> int:
+        """Put jobs left 'running' by a crashed worker back to pending. Call before starting workers."""
+        sql, args = "UPDATE jobs SET status = 'pending', updated = ? WHERE status = 'running'", [time.time()]
+        if source:
+            sql += " AND source = ?"
+            args.append(source)
+        return self._db.execute(sql, args).rowcount
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        out = {}
+        for source, status, n in self._db.execute(
+                "SELECT source, status, COUNT(*) FROM jobs GROUP BY source, status ORDER BY source, status"):
+            out.setdefault(source, {})[status] = n
+        return out
+
+    def failed(self) -> list[dict]:
+        return [dict(r) for r in self._db.execute("SELECT * FROM jobs WHERE status = 'failed' ORDER BY id")]
+
+
+def main(path):
+    q = JobQueue(path)
+    for source, by_status in q.counts().items():
+        print(f"{source:<14}" + "  ".join(f"{k}={v}" for k, v in by_status.items()))
+    for job in q.failed():
+        print(f"failed: {job['source']} {job['club']} ({job['attempts']} attempts) {job['error']}")
+    q.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else QUEUE_PATH)
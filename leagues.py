@@ -0,0 +1,57 @@
+# League/season configuration shared by the scrapers and the crawler.
+#
+# SEASON is the starting year of a season (2024 -> 2024/25): Transfermarkt URLs
+# take it as saison_id=2024, FBref URLs as "2024-2025". leagues.json lists the
+# competitions to crawl; adding a league there needs no code change.
+
+import json
+from pathlib import Path
+
+SEASON = 2024
+CONFIG_PATH = Path(__file__).resolve().parent / "leagues.json"
+
+OUTPUT_ROOT = Path("outputs")
+TM_BASE = "https://www.transfermarkt.co.uk"
+FBREF_BASE = "https://fbref.com"
+
+
+def fbref_season(season: int = SEASON) -> str:
+    return f"{season}-{season + 1}"
+
+
+def season_end(season: int = SEASON) -> str:
+    """ISO date ages are taken at: the end of June the season finishes."""
+    return f"{season + 1}-06-30"
+
+
+def output_dir(season: int = SEASON, root=OUTPUT_ROOT) -> Path:
+    """Where the scrapers write one season's per-club CSVs and mergecsv.py reads them."""
+    return Path(root) / f"season={season}"
+
+
+def load_config(path=CONFIG_PATH, season: int | None = None) -> dict:
+    """Read the league list; `season` overrides the file's season (which defaults to SEASON)."""
+    with open(path, encoding="utf-8") as fh:
+        conf = json.load(fh)
+    conf["season"] = int(season if season is not None else conf.get("season", SEASON))
+    for league in conf["leagues"]:
+        league.setdefault("tm_path", "")
+        league.setdefault("fbref_comp", None)
+    return conf
+
+
+def tm_league_url(league: dict, season: int = SEASON) -> str:
+    return f"{TM_BASE}/{league['tm_path']}/plus/?saison_id={season}"
+
+
+def fbref_league_url(league: dict, season: int = SEASON) -> str:
+    s = fbref_season(season)
+    return f"{FBREF_BASE}/en/comps/{league['fbref_comp']}/{s}/{s}-{league['fbref_slug']}-Stats"
+
+
+def tm_squad_url(slug: str, club_id: str, season: int = SEASON) -> str:
+    return f"{TM_BASE}/{slug}/kader/verein/{club_id}/plus/1/galerie/0?saison_id={season}"
+
+
+def fbref_squad_url(squad_id: str, name_slug: str, season: int = SEASON) -> str:
+    return f"{FBREF_BASE}/en/squads/{squad_id}/{fbref_season(season)}/all_comps/{name_slug}-Stats-All-Competitions"
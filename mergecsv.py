@@ -1,243 +1,234 @@
-import pandas as pd
-import numpy as np
+# Join the Transfermarkt and FBref scrapes into all_squads.csv.
+#
+# Rows are paired per club on a normalized player name: an exact hash lookup
+# first, then an accent-folding fuzzy match restricted to candidates that share
+# a club and a name token, so cost stays linear in squad size rather than
+# all-vs-all across the league. The scrapers' CSVs are read from outputs/season=<season>/
+# and the merged table is also stored as that season in the history store (history.py).
+# Usage: python mergecsv.py [--season 2024]
+
+import argparse
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
 from pathlib import Path
 
+import pandas as pd
 
-MIN_90S = 20 # eligibility floor
-IN_PATH  = Path("all_squads.csv")
-OUT_PATH = Path("all_squads_ranked.csv")
-
-
-df = pd.read_csv(IN_PATH)
-
-for col in df.columns:
-    if df[col].dtype == object:
-
-        coerced = pd.to_numeric(df[col].astype(str).str.replace('%', '', regex=False), errors='coerce')
-        if coerced.notna().any():
-            df[col] = coerced.combine_first(df[col])
-
-
-df["90s Played"] = pd.to_numeric(df["90s Played"], errors="coerce")
-
-
-def map_role(pos: str) -> str | None:
-    if not isinstance(pos, str):
-        return None
-    p = pos.lower()
-    if "goalkeeper" in p:
-        return "GK"
-    if any(k in p for k in ["centre-back", "right-back", "left-back"]):
-        return "DF"
-    if any(k in p for k in ["attacking midfield", "defensive midfield", "central midfield"]):
-        return "MF"
-    if any(k in p for k in ["left winger", "centre-forward", 'right winger']):
-        return "FWD"
-    return None
-
-df["role"] = df["Position"].apply(map_role)
-
-
-def safe_div(num, den):
-    num = pd.to_numeric(num, errors="coerce")
-    den = pd.to_numeric(den, errors="coerce")
-    return np.where(den > 0, num / den, np.nan)
-
-def as_series(arr):
-    return pd.Series(arr, index=df.index, dtype="float64")
-
-df["prog_carries_90_any"] = np.nan
-df["prog_passes_rec_90_any"] = np.nan
-
-
-df["prog_carries_90_any"] = df["prog_carries_90_any"].combine_first(pd.to_numeric(df.get("mf_progressive_carries_90"), errors="coerce"))
-df["prog_passes_rec_90_any"] = df["prog_passes_rec_90_any"].combine_first(pd.to_numeric(df.get("mf_progressive_passes_rec_90"), errors="coerce"))
-df["prog_passes_rec_90_any"] = df["prog_passes_rec_90_any"].combine_first(pd.to_numeric(df.get("df_progressive_passes_rec_90"), errors="coerce"))
-
-
-df["prog_carries_90_any"] = df["prog_carries_90_any"].combine_first(
-    as_series(safe_div(df.get("Progressive Carries"), df["90s Played"]))
-)
-df["prog_passes_rec_90_any"] = df["prog_passes_rec_90_any"].combine_first(
-    as_series(safe_div(df.get("Progressive Passes Received"), df["90s Played"]))
-)
-
-
-df["prog_passes_90_any"] = pd.to_numeric(df.get("mf_progressive_passes_90"), errors="coerce")
-df["prog_passes_90_any"] = df["prog_passes_90_any"].combine_first(
-    as_series(safe_div(df.get("Progressive Passes"), df["90s Played"]))
-)
-
-
-df["yc_90"] = as_series(safe_div(df.get("Yellow Cards"), df["90s Played"]))
-df["rc_90"] = as_series(safe_div(df.get("Red Cards"), df["90s Played"]))
-
-
-def z_by_role(s, role_series):
-    s = pd.to_numeric(s, errors="coerce")
-    out = pd.Series(index=s.index, dtype="float64")
-    for r in ["FWD", "MF", "DF", "GK"]:
-        mask = (role_series == r) & (df["90s Played"] >= MIN_90S)
-        mu = s[mask].mean()
-        sd = s[mask].std(ddof=0)
-        out.loc[mask] = (s.loc[mask] - mu) / sd if sd and not np.isclose(sd, 0) else 0.0
-    return out.fillna(0.0)
-
-
-# Forwards
-fwd_score = (
-    0.40 * z_by_role(df["Goals scored per 90 minutes"], df["role"]) +
-    0.15 * z_by_role(df["npxg per 90 minutes"], df["role"]) +
-    0.10 * z_by_role(df["xg per 90 minutes"], df["role"]) +
-    0.10 * z_by_role(df["Assists per 90 minutes"], df["role"]) +
-    0.10 * z_by_role(df["xag per 90 minutes"], df["role"]) +
-    0.05 * z_by_role(df["prog_carries_90_any"], df["role"]) +
-    0.10 * z_by_role(df["prog_passes_rec_90_any"], df["role"]) -
-    0.05 * z_by_role(0.7*df["yc_90"] + 1.3*df["rc_90"], df["role"])
-)
-
-# Midfielders
-mf_score = (
-    0.25 * z_by_role(df["mf_shot_creating_actions_90"], df["role"]) +
-    0.20 * z_by_role(df["prog_passes_90_any"], df["role"]) +
-    0.15 * z_by_role(df["prog_carries_90_any"], df["role"]) +
-    0.05 * z_by_role(df["prog_passes_rec_90_any"], df["role"]) +
-    0.10 * z_by_role(df["Assists per 90 minutes"], df["role"]) +
-    0.10 * z_by_role(df["mf_passes_attempted_90"], df["role"]) +
-    0.10 * z_by_role(df["mf_pass_completion_pct"], df["role"]) +
-    0.05 * z_by_role(df["mf_tackles_90"], df["role"]) +
-    0.05 * z_by_role(df["mf_interceptions_90"], df["role"])
-)
-
-# Defenders
-df_score = (
-    0.20 * z_by_role(df["df_interceptions_90"], df["role"]) +
-    0.20 * z_by_role(df["df_tackles_90"], df["role"]) +
-    0.15 * z_by_role(df["df_blocks_90"], df["role"]) +
-    0.15 * z_by_role(df["df_clearances_90"], df["role"]) +
-    0.15 * z_by_role(df["df_aerials_won_90"], df["role"]) +
-    0.10 * z_by_role(df["df_progressive_passes_rec_90"], df["role"]) -
-    0.05 * z_by_role(0.7*df["yc_90"] + 1.3*df["rc_90"], df["role"])
-)
-
-# Goalkeepers
-gk_score = (
-    0.40 * z_by_role(df["gk_save_percentage"], df["role"]) +
-    0.20 * z_by_role(df["gk_clean_sheet_percentage"], df["role"]) +
-    0.10 * z_by_role(df["gk_crosses_stopped_pct"], df["role"]) +
-    0.10 * z_by_role(df["gk_def_actions_outside_pen_area"], df["role"]) +
-    0.05 * z_by_role(df["gk_avg_distance_of_def_actions"], df["role"]) +
-    0.10 * z_by_role(df["gk_save_pct_penalty_kicks"], df["role"]) +
-    0.05 * z_by_role(df["gk_psxg_per_sot"], df["role"])
-)
-
-
-df["fwd_score"] = np.where(df["role"]=="FWD", fwd_score, np.nan)
-df["mf_score"]  = np.where(df["role"]=="MF",  mf_score,  np.nan)
-df["df_score"]  = np.where(df["role"]=="DF",  df_score,  np.nan)
-df["gk_score"]  = np.where(df["role"]=="GK",  gk_score,  np.nan)
-
-def rank_within_role(score_col):
-    return df.groupby("role")[score_col].rank(method="dense", ascending=False)
-
-df["fwd_rank"] = np.where(df["role"]=="FWD", rank_within_role("fwd_score"), np.nan)
-df["mf_rank"]  = np.where(df["role"]=="MF",  rank_within_role("mf_score"),  np.nan)
-df["df_rank"]  = np.where(df["role"]=="DF",  rank_within_role("df_score"),  np.nan)
-df["gk_rank"]  = np.where(df["role"]=="GK",  rank_within_role("gk_score"),  np.nan)
-
-df.loc[(df["90s Played"].isna()) | (df["90s Played"] < MIN_90S),
-       ["fwd_rank","mf_rank","df_rank","gk_rank"]] = np.nan
-
-
-
-def _parse_market_value_to_eur(x):
+from leagues import SEASON, load_config, output_dir
+from storage import write_parquet
+
+# -------- Settings --------
+OUT_PATH    = Path("all_squads.csv")
+REPORT_PATH = Path("merge_unmatched.csv")
+SQUAD_DIR   = Path(".")           # per-club <club>_squad.csv files
+FUZZY_MIN_SCORE = 0.80
+
+TM_COLUMNS = ["Player", "Position", "Date of birth / Age", "Height", "Foot", "Market value", "Club", "League"]
+
+# scrapefbref de-duplicates the per-90 block of the standard table as "<stat>_1"
+PER90_RENAMES = {
+    "gls_1": "Goals scored per 90 minutes",
+    "ast_1": "Assists per 90 minutes",
+    "g+a_1": "Goal+ Assist per 90 minutes",
+    "g-pk_1": "g-pk per 90 minutes",
+    "g+a-pk": "g+a-pk per 90 minutes",
+    "xg_1": "xg per 90 minutes",
+    "xag_1": "xag per 90 minutes",
+    "xg+xag": "xg+xag per 90 minutes",
+    "npxg_1": "npxg per 90 minutes",
+    "npxg+xag_1": "npxg+xag per 90 minutes",
+}
+
+# FBref's nation cell is flag code + FIFA code ("brBRA", "engENG"); all_squads keeps the country name
+NATIONS = {
+    "ALB": "Albania", "ALG": "Algeria", "AND": "Andorra", "ANG": "Angola", "ARG": "Argentina", "ARM": "Armenia",
+    "AUS": "Australia", "AUT": "Austria", "AZE": "Azerbaijan", "BEL": "Belgium", "BEN": "Benin", "BFA": "Burkina Faso",
+    "BIH": "Bosnia and Herzegovina", "BLR": "Belarus", "BOL": "Bolivia", "BRA": "Brazil", "BUL": "Bulgaria",
+    "CAN": "Canada", "CHI": "Chile", "CHN": "China", "CIV": "Côte d'Ivoire", "CMR": "Cameroon", "COD": "DR Congo",
+    "CGO": "Congo", "COL": "Colombia", "CPV": "Cape Verde", "CRC": "Costa Rica", "CRO": "Croatia", "CUW": "Curaçao",
+    "CYP": "Cyprus", "CZE": "Czech Republic", "DEN": "Denmark", "DOM": "Dominican Republic", "ECU": "Ecuador",
+    "EGY": "Egypt", "ENG": "England", "EQG": "Equatorial Guinea", "ESP": "Spain", "EST": "Estonia", "FIN": "Finland",
+    "FRA": "France", "FRO": "Faroe Islands", "GAB": "Gabon", "GAM": "Gambia", "GEO": "Georgia", "GER": "Germany",
+    "GHA": "Ghana", "GNB": "Guinea-Bissau", "GRE": "Greece", "GUI": "Guinea", "GLP": "Guadeloupe", "HAI": "Haiti",
+    "HON": "Honduras", "HUN": "Hungary", "IRL": "Ireland", "IRN": "Iran", "IRQ": "Iraq", "ISL": "Iceland",
+    "ISR": "Israel", "ITA": "Italy", "JAM": "Jamaica", "JPN": "Japan", "KEN": "Kenya", "KOR": "Korea Republic",
+    "KSA": "Saudi Arabia", "KVX": "Kosovo", "LTU": "Lithuania", "LUX": "Luxembourg", "LVA": "Latvia", "MAR": "Morocco",
+    "MDA": "Moldova", "MEX": "Mexico", "MKD": "North Macedonia", "MLI": "Mali", "MLT": "Malta", "MNE": "Montenegro",
+    "MOZ": "Mozambique", "MTQ": "Martinique", "NED": "Netherlands", "NGA": "Nigeria", "NIR": "Northern Ireland",
+    "NOR": "Norway", "NZL": "New Zealand", "PAN": "Panama", "PAR": "Paraguay", "PER": "Peru", "POL": "Poland",
+    "POR": "Portugal", "ROU": "Romania", "RSA": "South Africa", "RUS": "Russia", "SCO": "Scotland", "SEN": "Senegal",
+    "SLE": "Sierra Leone", "SRB": "Serbia", "SUI": "Switzerland", "SUR": "Suriname", "SVK": "Slovakia",
+    "SVN": "Slovenia", "SWE": "Sweden", "TOG": "Togo", "TUN": "Tunisia", "TUR": "Turkey", "UKR": "Ukraine",
+    "URU": "Uruguay", "USA": "United States", "UZB": "Uzbekistan", "VEN": "Venezuela", "WAL": "Wales",
+    "ZAM": "Zambia", "ZIM": "Zimbabwe",
+}
+
+# letters NFKD does not decompose into base + accent
+_FOLD = str.maketrans({"ø": "o", "Ø": "O", "æ": "ae", "Æ": "AE", "œ": "oe", "Œ": "OE", "ß": "ss",
+                       "ł": "l", "Ł": "L", "đ": "d", "Đ": "D", "ð": "d", "þ": "th", "ı": "i"})
+
+
+def fold_accents(s: str) -> str:
+    s = unicodedata.normalize("NFKD", s.translate(_FOLD))
+    return "".join(ch for ch in s if not unicodedata.combining(ch))
+
+def normalize_name(name) -> str:
+    if not isinstance(name, str):
+        return ""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", fold_accents(name).lower()).split())
+
+def club_key(club) -> str:
+    return re.sub(r"[^a-z0-9]+", "", fold_accents(str(club)).lower())
+
+
+def nation_name(nation):
+    """'brBRA' -> 'Brazil'; names and unknown codes are returned as they are."""
+    if not isinstance(nation, str):
+        return nation
+    m = re.fullmatch(r"[a-z]*\s*([A-Z]{3})", nation.strip())
+    return NATIONS.get(m.group(1), nation) if m else nation
+
+
+def club_order(df: pd.DataFrame) -> pd.DataFrame:
+    """Rows grouped by club: leagues in leagues.json order (others after), clubs by name; row order kept within a club."""
+    leagues = {lg["name"]: i for i, lg in enumerate(load_config()["leagues"])}
+    rank = df["League"].map(leagues).fillna(len(leagues)) if "League" in df.columns else pd.Series(0, index=df.index)
+    keys = pd.DataFrame({"league": rank, "league_name": df.get("League"), "club": df["Club"]}, index=df.index)
+    return df.loc[keys.sort_values(["league", "league_name", "club"], kind="stable").index]
+
+
+def name_similarity(a: str, b: str) -> float:
+    """Similarity of two normalized names; a name contained token-wise in the other scores 0.9."""
+    if a == b:
+        return 1.0
+    ta, tb = set(a.split()), set(b.split())
+    ratio = SequenceMatcher(None, a, b).ratio()
+    if ta and tb and (ta <= tb or tb <= ta):
+        ratio = max(ratio, 0.9)
+    return ratio
+
+
+def match_players(fb_keys: list[tuple[str, str]], tm_keys: list[tuple[str, str]],
+                  min_score: float = FUZZY_MIN_SCORE) -> dict[int, tuple[int, float, str]]:
     """
-    Accepts values like '€50m', '€750k', '50,000,000', 50000000, or NaN.
-    Returns numeric euros (float) or NaN.
+    Pair FBref rows with Transfermarkt rows given (club_key, normalized_name) per row.
+    Returns {fbref_idx: (tm_idx, score, "exact" | "fuzzy")}; each row is used at most once.
     """
-    if pd.isna(x):
-        return np.nan
-    s = str(x).strip().lower()
-    for ch in ["€", "$", "£", ",", " "]:
-        s = s.replace(ch, "")
-
-    mult = 1.0
-    if s.endswith("m"):
-        mult = 1_000_000.0
-        s = s[:-1]
-    elif s.endswith("k"):
-        mult = 1_000.0
-        s = s[:-1]
-
-    try:
-        base = float("".join(ch for ch in s if (ch.isdigit() or ch == ".")))
-        return base * mult
-    except ValueError:
-        return np.nan
-
-
-_market_value_candidates = [
-    "market_value_eur", "Market value", "Market Value", "market value",
-    "TM_Market_Value", "tm_market_value", "value", "Value", "mv"
-]
-mv_col = next((c for c in _market_value_candidates if c in df.columns), None)
-if mv_col is None:
-    raise KeyError(
-        "No market value column found. Add one of: "
-        + ", ".join(_market_value_candidates)
+    exact = defaultdict(list)
+    for j, key in enumerate(tm_keys):
+        exact[key].append(j)
+
+    matches, used_tm = {}, set()
+    for i, key in enumerate(fb_keys):
+        for j in exact.get(key, ()):
+            if j not in used_tm:
+                matches[i] = (j, 1.0, "exact")
+                used_tm.add(j)
+                break
+
+    # block the leftovers on (club, name token): only rows sharing one are compared
+    blocks = defaultdict(list)
+    for j, (club, name) in enumerate(tm_keys):
+        if j in used_tm:
+            continue
+        for tok in set(name.split()):
+            blocks[(club, tok)].append(j)
+
+    candidates = []
+    for i, (club, name) in enumerate(fb_keys):
+        if i in matches or not name:
+            continue
+        seen = set()
+        for tok in set(name.split()):
+            for j in blocks.get((club, tok), ()):
+                if j in seen:
+                    continue
+                seen.add(j)
+                score = name_similarity(name, tm_keys[j][1])
+                if score >= min_score:
+                    candidates.append((score, i, j))
+
+    for score, i, j in sorted(candidates, key=lambda c: (-c[0], c[1], c[2])):
+        if i in matches or j in used_tm:
+            continue
+        matches[i] = (j, score, "fuzzy")
+        used_tm.add(j)
+    return matches
+
+
+def load_sources(input_dir: Path) -> tuple[pd.DataFrame, pd.DataFrame]:
+    fb_frames = []
+    for path in sorted(input_dir.glob("*_fbref.csv")):
+        fb = pd.read_csv(path, encoding="utf-8-sig")
+        fb["_club_key"] = club_key(path.stem[: -len("_fbref")])
+        fb_frames.append(fb)
+    tm_frames = [pd.read_csv(p, encoding="utf-8-sig") for p in sorted(input_dir.glob("*transfermarket.csv"))]
+    if not fb_frames or not tm_frames:
+        raise FileNotFoundError(f"Need both *_fbref.csv and *transfermarket.csv files in {input_dir}/")
+    tm = pd.concat(tm_frames, ignore_index=True)
+    tm["_club_key"] = tm["Club"].map(club_key)
+    return pd.concat(fb_frames, ignore_index=True), tm
+
+
+def merge_sources(fb: pd.DataFrame, tm: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Return (merged rows in FBref order, report of unmatched rows from either side)."""
+    fb_keys = list(zip(fb["_club_key"], fb["player"].map(normalize_name)))
+    tm_keys = list(zip(tm["_club_key"], tm["Player"].map(normalize_name)))
+    matches = match_players(fb_keys, tm_keys)
+
+    fb_idx = sorted(matches)
+    tm_idx = [matches[i][0] for i in fb_idx]
+    merged = pd.concat([
+        fb.iloc[fb_idx].drop(columns="_club_key").reset_index(drop=True),
+        tm.iloc[tm_idx][[c for c in TM_COLUMNS if c in tm.columns]].reset_index(drop=True),
+    ], axis=1)
+
+    fuzzy = sum(1 for _, _, how in matches.values() if how == "fuzzy")
+    print(f"Matched {len(matches)} players ({len(matches) - fuzzy} exact, {fuzzy} fuzzy)")
+
+    matched_tm = set(tm_idx)
+    # FBref files carry no club column: name their rows after the Transfermarkt club with the same key
+    club_names = dict(zip(tm["_club_key"], tm["Club"]))
+    report = pd.DataFrame(
+        [{"source": "fbref", "club": club_names.get(fb.at[i, "_club_key"], fb.at[i, "_club_key"]),
+          "player": fb.at[i, "player"]}
+         for i in range(len(fb)) if i not in matches]
+        + [{"source": "transfermarkt", "club": tm.at[j, "Club"], "player": tm.at[j, "Player"]}
+           for j in range(len(tm)) if j not in matched_tm],
+        columns=["source", "club", "player"],
     )
+    return merged, report
 
 
-if pd.api.types.is_numeric_dtype(df[mv_col]):
-    df["_market_value_eur"] = pd.to_numeric(df[mv_col], errors="coerce")
-else:
-    df["_market_value_eur"] = df[mv_col].apply(_parse_market_value_to_eur)
-
-
-df.loc[~(df["_market_value_eur"] > 0), "_market_value_eur"] = np.nan
-
-
-df["fwd_underrated"] = np.where(df["role"] == "FWD", df["fwd_score"] / df["_market_value_eur"], np.nan)
-df["mf_underrated"]  = np.where(df["role"] == "MF",  df["mf_score"]  / df["_market_value_eur"], np.nan)
-df["df_underrated"]  = np.where(df["role"] == "DF",  df["df_score"]  / df["_market_value_eur"], np.nan)
-df["gk_underrated"]  = np.where(df["role"] == "GK",  df["gk_score"]  / df["_market_value_eur"], np.nan)
-
-
-def _rank_role(col):
-    return df.groupby("role")[col].rank(method="dense", ascending=False)
-
-df["fwd_underrated_rank"] = np.where(df["role"]=="FWD", _rank_role("fwd_underrated"), np.nan)
-df["mf_underrated_rank"]  = np.where(df["role"]=="MF",  _rank_role("mf_underrated"),  np.nan)
-df["df_underrated_rank"]  = np.where(df["role"]=="DF",  _rank_role("df_underrated"),  np.nan)
-df["gk_underrated_rank"]  = np.where(df["role"]=="GK",  _rank_role("gk_underrated"),  np.nan)
-
-
-elig_mask = (
-    (~df["90s Played"].isna()) &
-    (df["90s Played"] >= MIN_90S) &
-    (~df["_market_value_eur"].isna()) &
-    (df["age"] < 30)
-)
-underr_cols = ["fwd_underrated_rank","mf_underrated_rank","df_underrated_rank","gk_underrated_rank"]
-df.loc[~elig_mask, underr_cols] = np.nan
+def main():
+    ap = argparse.ArgumentParser(description="Join the Transfermarkt and FBref scrapes of one season.")
+    ap.add_argument("--season", type=int, default=SEASON, help="season start year (2024 = 2024/25)")
+    args = ap.parse_args()
+    from history import write_season   # history.py imports normalize_name from here
 
+    fb, tm = load_sources(output_dir(args.season))
+    merged, report = merge_sources(fb, tm)
+    merged = club_order(merged).reset_index(drop=True)
 
-df.to_csv(OUT_PATH, index=False, encoding="utf-8-sig")
-print("Saved:", OUT_PATH)
+    for club, squad in merged.groupby("Club", sort=False):
+        squad_path = SQUAD_DIR / f"{club_key(club)}_squad.csv"
+        squad.to_csv(squad_path, index=False, encoding="utf-8-sig")
 
-top_players = pd.concat([
-    df.loc[df["fwd_rank"] == 1, :],
-    df.loc[df["mf_rank"] == 1, :],
-    df.loc[df["df_rank"] == 1, :],
-    df.loc[df["gk_rank"] == 1, :]
-])
+    # the per-club files keep FBref's columns and nation codes; all_squads gets the country names
+    all_squads = merged.drop(columns="Player").rename(columns=PER90_RENAMES)
+    if "nation" in all_squads.columns:
+        all_squads["nation"] = all_squads["nation"].map(nation_name)
+    all_squads.to_csv(OUT_PATH, index=False, encoding="utf-8-sig")
+    print(f"Saved {len(all_squads)} rows → {OUT_PATH}")
+    if write_parquet(all_squads, OUT_PATH.with_suffix(".parquet")):
+        print(f"Saved typed copy → {OUT_PATH.with_suffix('.parquet')}")
+    print(f"Stored season {args.season}: {write_season(all_squads, 'squads', args.season)} club partitions")
 
+    report.to_csv(REPORT_PATH, index=False, encoding="utf-8-sig")
+    print(f"{len(report)} unmatched rows → {REPORT_PATH}")
 
-for role in ["FWD", "MF", "DF", "GK"]:
-   print(f"\nTop {role}:\n", top_players[top_players["role"] == role][["player", "Club", "fwd_rank", "mf_rank", "df_rank", "gk_rank"]])
 
-for role, col in [("FWD","fwd_underrated_rank"), ("MF","mf_underrated_rank"),
-                  ("DF","df_underrated_rank"), ("GK","gk_underrated_rank")]:
-    subset = df[(df["role"]==role) & (~df[col].isna())].nsmallest(10, col)
-    cols_to_show = [c for c in ["player","Player","Name","Squad","Club", col] if c in subset.columns]
-    print(f"\nMost underrated Top 10 — {role}:\n", subset[cols_to_show])
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# Lightweight per-stage timing and event counters for the scrapers.
+#
+#   with metrics.span("fbref.club_get"):
+#       driver.get(url)
+#   metrics.incr("cache_hits")
+#
+# The registry is process-global and thread-safe. At the end of a run export()
+# writes <job>.json and a Prometheus textfile (<job>.prom) for node_exporter's
+# textfile collector. Worker processes send snapshot() home for merge().
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+METRICS_DIR = Path("metrics")
+
+_lock = threading.Lock()
+_spans = {}     # stage -> {"count", "seconds", "max_seconds"}
+_counters = {}  # event -> value
+
+
+@contextmanager
+def span(stage: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        with _lock:
+            s = _spans.setdefault(stage, {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+            s["count"] += 1
+            s["seconds"] += dt
+            s["max_seconds"] = max(s["max_seconds"], dt)
+
+
+def incr(event: str, n: float = 1):
+    with _lock:
+        _counters[event] = _counters.get(event, 0) + n
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {"spans": {k: dict(v) for k, v in _spans.items()}, "counters": dict(_counters)}
+
+
+def merge(snap: dict):
+    """Fold another process's snapshot() into this registry."""
+    with _lock:
+        for stage, o in snap.get("spans", {}).items():
+            s = _spans.setdefault(stage, {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+            s["count"] += o["count"]
+            s["seconds"] += o["seconds"]
+            s["max_seconds"] = max(s["max_seconds"], o["max_seconds"])
+        for event, n in snap.get("counters", {}).items():
+            _counters[event] = _counters.get(event, 0) + n
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+def _prom_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(job: str, snap: dict | None = None) -> str:
+    snap = snap or snapshot()
+    job = _prom_label(job)
+    lines = [
+        "# HELP scrape_stage_seconds_total Wall-clock seconds spent in each scraper stage.",
+        "# TYPE scrape_stage_seconds_total counter",
+    ]
+    spans = sorted(snap["spans"].items())
+    lines += [f'scrape_stage_seconds_total{{job="{job}",stage="{_prom_label(k)}"}} {v["seconds"]:.6f}' for k, v in spans]
+    lines += ["# HELP scrape_stage_calls_total Times each scraper stage ran.",
+              "# TYPE scrape_stage_calls_total counter"]
+    lines += [f'scrape_stage_calls_total{{job="{job}",stage="{_prom_label(k)}"}} {v["count"]}' for k, v in spans]
+    lines += ["# HELP scrape_stage_max_seconds Slowest single run of each scraper stage.",
+              "# TYPE scrape_stage_max_seconds gauge"]
+    lines += [f'scrape_stage_max_seconds{{job="{job}",stage="{_prom_label(k)}"}} {v["max_seconds"]:.6f}' for k, v in spans]
+    lines += ["# HELP scrape_events_total Scraper events: pages fetched, cache hits, timeouts, bytes parsed.",
+              "# TYPE scrape_events_total counter"]
+    lines += [f'scrape_events_total{{job="{job}",event="{_prom_label(k)}"}} {v:g}'
+              for k, v in sorted(snap["counters"].items())]
+    lines += ["# HELP scrape_last_run_timestamp_seconds Unix time the run's metrics were exported.",
+              "# TYPE scrape_last_run_timestamp_seconds gauge",
+              f'scrape_last_run_timestamp_seconds{{job="{job}"}} {time.time():.0f}']
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path: Path, text: str):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)   # the textfile collector must never read a half-written file
+
+
+def export(job: str, out_dir=METRICS_DIR) -> tuple[Path, Path]:
+    """Write <out_dir>/<job>.json and <out_dir>/<job>.prom; print the slowest stages."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    snap = snapshot()
+    json_path, prom_path = out_dir / f"{job}.json", out_dir / f"{job}.prom"
+    _write_atomic(json_path, json.dumps({"job": job, "finished": time.strftime("%Y-%m-%dT%H:%M:%S"), **snap},
+                                        indent=2))
+    _write_atomic(prom_path, prometheus_text(job, snap))
+
+    print(f"\n{'Stage':<28}{'Calls':>7}{'Seconds':>10}{'Max':>8}")
+    for stage, s in sorted(snap["spans"].items(), key=lambda kv: -kv[1]["seconds"]):
+        print(f"{stage:<28}{s['count']:>7}{s['seconds']:>10.1f}{s['max_seconds']:>8.1f}")
+    print("Counters:", {k: v for k, v in sorted(snap["counters"].items())})
+    print(f"Metrics → {json_path}, {prom_path}")
+    return json_path, prom_path
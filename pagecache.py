@@ -0,0 +1,104 @@
+# Persistent on-disk HTML cache shared by the FBref and Transfermarkt scrapers.
+
+import hashlib
+import os
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+DAY = 24 * 3600
+DEFAULT_TTLS = {
+    "fbref.com": 7 * DAY,               # season stats only move on matchdays
+    "transfermarkt.co.uk": 1 * DAY,     # market values are revised more often
+}
+DEFAULT_TTL = 1 * DAY
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+class PageCache:
+    """
+    Content-addressed page store: each URL maps to <root>/<host>/<sha256(url)>.html.
+    Entries expire after the TTL of their source host; once the cache grows past
+    `max_bytes` the least recently used pages are evicted first.
+    """
+
+    def __init__(self, root="cache/pages", ttls: dict | None = None,
+                 default_ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.counters = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._size = sum(p.stat().st_size for p in self.root.glob("*/*.html"))
+
+    def path_for(self, url: str) -> Path:
+        host = urlparse(url).netloc or "_"
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / host / f"{key}.html"
+
+    def ttl_for(self, url: str) -> float:
+        host = urlparse(url).netloc
+        for suffix, ttl in self.ttls.items():
+            if host == suffix or host.endswith("." + suffix):
+                return ttl
+        return self.default_ttl
+
+    def get(self, url: str) -> str | None:
+        """Return the cached HTML for `url`, or None on a miss or expired entry."""
+        path = self.path_for(url)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            self.counters["misses"] += 1
+            return None
+        # mtime is the fetch time; atime is bumped on every hit and drives LRU eviction
+        if time.time() - st.st_mtime > self.ttl_for(url):
+            self.counters["expired"] += 1
+            self.counters["misses"] += 1
+            self._remove(path)
+            return None
+        html = path.read_text(encoding="utf-8")
+        os.utime(path, (time.time(), st.st_mtime))
+        self.counters["hits"] += 1
+        return html
+
+    def put(self, url: str, html: str) -> Path:
+        path = self.path_for(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            self._size -= path.stat().st_size
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(html, encoding="utf-8")
+        os.replace(tmp, path)
+        self._size += path.stat().st_size
+        self.counters["stores"] += 1
+        if self._size > self.max_bytes:
+            self._evict(keep=path)
+        return path
+
+    def _remove(self, path: Path):
+        try:
+            size = path.stat().st_size
+            path.unlink()
+            self._size -= size
+        except FileNotFoundError:
+            pass
+
+    def _evict(self, keep: Path):
+        entries = sorted(self.root.glob("*/*.html"), key=lambda p: p.stat().st_atime)
+        for path in entries:
+            if self._size <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            self._remove(path)
+            self.counters["evictions"] += 1
+
+    def stats(self) -> dict:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+            "bytes": self._size,
+        }
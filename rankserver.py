@@ -0,0 +1,260 @@
+# Long-lived query service over the ranked dataset.
+#
+# Loads all_squads_ranked (the .parquet sibling when present) once, builds per-role
+# orderings by score and by underrated rank, pre-split by club, league and age band,
+# and answers over plain HTTP from an asyncio server. The file is watched and the
+# indexes are rebuilt off the event loop and swapped in whenever it changes.
+#
+#   GET /top?role=FWD&k=10[&club=Arsenal][&league=La Liga][&age_band=u21]
+#   GET /underrated?role=DF&k=10[&club=...][&league=...][&age_band=...][&max_age=25]
+#   GET /player?name=Pedri          rank and percentile in the player's role, by score and underrated
+#   GET /health
+# Usage: python rankserver.py [--path all_squads_ranked.csv] [--host 127.0.0.1] [--port 8765]
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from scoring import (RANK_COLUMNS, ROLES, SCORE_COLUMNS, UNDERRATED_COLUMNS, UNDERRATED_RANK_COLUMNS, listed_age,
+                     ranked_orders)
+from storage import read_squads
+
+RANKED_PATH = Path("all_squads_ranked.csv")
+HOST, PORT = "127.0.0.1", 8765
+RELOAD_INTERVAL = 2.0   # seconds between checks of the ranked file's mtime
+DEFAULT_K, MAX_K = 10, 500
+
+# (label, lowest age, first age past the band)
+AGE_BANDS = [("u21", 0, 21), ("21-25", 21, 26), ("26-29", 26, 30), ("30+", 30, 200)]
+RESULT_COLUMNS = ["player", "Club", "League", "nation", "Position", "role", "age", "Market value", "_market_value_eur"]
+FILTERS = ["club", "league", "age_band"]   # most selective first: the query starts from that split
+
+
+def age_band_of(age: pd.Series) -> pd.Series:
+    band = pd.Series(None, index=age.index, dtype=object)
+    for label, lo, hi in AGE_BANDS:
+        band[(age >= lo) & (age < hi)] = label
+    return band
+
+
+def _json_value(v):
+    if v is None or (isinstance(v, float) and math.isnan(v)) or v is pd.NA or v is pd.NaT:
+        return None
+    if isinstance(v, np.generic):
+        return v.item()
+    if isinstance(v, pd.Timestamp):
+        return v.isoformat()
+    return v
+
+
+class RankIndex:
+    """Immutable query indexes over one ranked frame; rebuilt wholesale on reload."""
+
+    def __init__(self, df: pd.DataFrame):
+        df = df.reset_index(drop=True)
+        self.n = len(df)
+        age = listed_age(df["age"]) if "age" in df.columns else listed_age(df["_age_at_ref"])
+        self.age = age.to_numpy()
+        self.codes, self.values = {}, {}
+        for name, col in [("club", df.get("Club")), ("league", df.get("League")), ("age_band", age_band_of(age))]:
+            if col is None:
+                col = pd.Series(None, index=df.index, dtype=object)
+            codes, uniques = pd.factorize(col.astype(object), use_na_sentinel=True)
+            self.codes[name] = codes
+            self.values[name] = {str(v).casefold(): i for i, v in enumerate(uniques)}
+
+        cols = [c for c in RESULT_COLUMNS if c in df.columns]
+        self._base = [{c: _json_value(v) for c, v in zip(cols, row)} for row in df[cols].itertuples(index=False)]
+
+        self.names = {}
+        for i, name in enumerate(df["player"].astype(str).str.casefold()):
+            self.names.setdefault(name, []).append(i)
+        self.role = df["role"].to_numpy(object)
+
+        # orders[kind][role][(filter, code) | None] -> row ids, best first
+        role_orders = ranked_orders(df)
+        self.role_orders = {"top": {r: role_orders[RANK_COLUMNS[r]] for r in ROLES},
+                            "underrated": {r: role_orders[UNDERRATED_RANK_COLUMNS[r]] for r in ROLES}}
+        self.orders = {kind: {r: self._split(o.ids) for r, o in by_role.items()}
+                       for kind, by_role in self.role_orders.items()}
+        self.metric = {"top": {}, "underrated": {}}
+        for role in ROLES:
+            self.metric["top"][role] = (df[SCORE_COLUMNS[role]].to_numpy(float), df[RANK_COLUMNS[role]].to_numpy(float))
+            self.metric["underrated"][role] = (df[UNDERRATED_COLUMNS[role]].to_numpy(float),
+                                               df[UNDERRATED_RANK_COLUMNS[role]].to_numpy(float))
+
+    def _split(self, ids: np.ndarray) -> dict:
+        """The ordered ids once whole and once per value of every filter (order kept within each)."""
+        out = {None: ids}
+        for name, codes in self.codes.items():
+            c = codes[ids]
+            perm = np.argsort(c, kind="stable")
+            bounds = np.flatnonzero(np.diff(c[perm])) + 1
+            for part in np.split(ids[perm], bounds):
+                if len(part) and codes[part[0]] >= 0:
+                    out[(name, int(codes[part[0]]))] = part
+        return out
+
+    def query(self, kind: str, role: str, k: int = DEFAULT_K, max_age: float | None = None, **filters) -> list[dict]:
+        wanted = {}
+        for name in FILTERS:
+            value = filters.get(name)
+            if value:
+                code = self.values[name].get(str(value).casefold())
+                if code is None:
+                    return []
+                wanted[name] = code
+        orders = self.orders[kind][role]
+        start = next((name for name in FILTERS if name in wanted), None)
+        ids = orders[(start, wanted[start])] if start else orders[None]
+        rest = [(self.codes[name], code) for name, code in wanted.items() if name != start]
+        if rest or max_age is not None:
+            ids = self._first_k(ids, rest, max_age, k)
+        ids = ids[:k]
+
+        value, rank = self.metric[kind][role]
+        label = "score" if kind == "top" else "underrated"
+        return [{**self._base[i], label: _json_value(value[i]), "rank": _json_value(rank[i])} for i in ids]
+
+    def player(self, name: str) -> list[dict]:
+        """Every row with this name, with its rank and percentile in its role by score and by underrated."""
+        out = []
+        for i in self.names.get(name.casefold(), []):
+            row = dict(self._base[i])
+            for kind, label in [("top", "score"), ("underrated", "underrated")]:
+                order = self.role_orders[kind].get(self.role[i])
+                if order is None:
+                    continue
+                value, rank = self.metric[kind][self.role[i]]
+                row[label] = _json_value(value[i])
+                row[f"{label}_rank"] = _json_value(rank[i])
+                row[f"{label}_percentile"] = _json_value(order.percentile(value[i])) if not np.isnan(rank[i]) else None
+            out.append(row)
+        return out
+
+    def _first_k(self, ids: np.ndarray, rest, max_age, k: int) -> np.ndarray:
+        """Scan `ids` in growing chunks, keeping rows that pass every remaining filter, until k are found."""
+        found, pos, chunk = [], 0, max(4 * k, 64)
+        while pos < len(ids) and sum(len(f) for f in found) < k:
+            part = ids[pos:pos + chunk]
+            keep = np.ones(len(part), dtype=bool)
+            for codes, code in rest:
+                keep &= codes[part] == code
+            if max_age is not None:
+                keep &= self.age[part] < max_age
+            found.append(part[keep])
+            pos += chunk
+            chunk *= 2
+        return np.concatenate(found) if found else ids[:0]
+
+
+class RankService:
+    def __init__(self, path=RANKED_PATH):
+        self.path = Path(path)
+        self.index = None
+        self.loaded_mtime = None
+        self.loaded_at = None
+
+    def _sources(self) -> list[Path]:
+        return [p for p in (self.path.with_suffix(".parquet"), self.path) if p.exists()]
+
+    def current_mtime(self):
+        return max((p.stat().st_mtime_ns for p in self._sources()), default=None)
+
+    def load(self):
+        mtime = self.current_mtime()
+        t0 = time.perf_counter()
+        index = RankIndex(read_squads(self.path))
+        self.index, self.loaded_mtime, self.loaded_at = index, mtime, time.time()
+        print(f"Loaded {index.n} rows from {self.path} in {time.perf_counter() - t0:.2f}s")
+
+    async def watch(self):
+        """Rebuild the indexes in a worker thread when the ranked file changes; keep serving the old ones."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(RELOAD_INTERVAL)
+            mtime = self.current_mtime()
+            if mtime is None or mtime == self.loaded_mtime:
+                continue
+            await asyncio.sleep(0.5)   # let the writer finish; a torn read just fails and retries
+            try:
+                await loop.run_in_executor(None, self.load)
+            except Exception as e:
+                print(f"Reload failed ({e!r}); still serving the previous data")
+
+    def answer(self, target: str) -> tuple[int, dict | list]:
+        url = urlsplit(target)
+        q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path == "/health":
+            return 200, {"rows": self.index.n, "path": str(self.path), "loaded_at": self.loaded_at}
+        if url.path == "/player":
+            if not q.get("name"):
+                return 400, {"error": "name is required"}
+            return 200, self.index.player(q["name"])
+        if url.path not in ("/top", "/underrated"):
+            return 404, {"error": f"unknown path {url.path}; use /top, /underrated, /player or /health"}
+        role = q.get("role", "").upper()
+        if role not in ROLES:
+            return 400, {"error": f"role must be one of {', '.join(ROLES)}"}
+        try:
+            k = int(q.get("k", DEFAULT_K))
+            max_age = float(q["max_age"]) if q.get("max_age") else None
+        except ValueError:
+            return 400, {"error": "k and max_age must be numbers"}
+        if not 1 <= k <= MAX_K:
+            return 400, {"error": f"k must be between 1 and {MAX_K}"}
+        return 200, self.index.query(url.path.strip("/"), role, k, max_age=max_age,
+                                     **{f: q.get(f) for f in FILTERS})
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            method, target, _ = head.split(b"\r\n", 1)[0].decode("latin-1").split(" ", 2)
+            t0 = time.perf_counter()
+            if method != "GET":
+                status, body = 405, {"error": "only GET is supported"}
+            else:
+                status, body = self.answer(target)
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}[status]
+            writer.write(
+                f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(payload)}\r\nX-Query-Ms: {(time.perf_counter() - t0) * 1000:.3f}\r\n"
+                f"Connection: close\r\n\r\n".encode("latin-1") + payload)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(path=RANKED_PATH, host: str = HOST, port: int = PORT):
+    service = RankService(path)
+    service.load()
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Serving {path} on http://{host}:{port}")
+    async with server:
+        await asyncio.gather(server.serve_forever(), service.watch())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve top-k and underrated queries over the ranked dataset.")
+    ap.add_argument("--path", default=RANKED_PATH)
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    args = ap.parse_args()
+    try:
+        asyncio.run(serve(args.path, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from storage import listed_age
+from tmparse import add_parsed_columns
+
+ROLES = ["FWD", "MF", "DF", "GK"]
+SCORE_COLUMNS = {"FWD": "fwd_score", "MF": "mf_score", "DF": "df_score", "GK": "gk_score"}
+RANK_COLUMNS = {"FWD": "fwd_rank", "MF": "mf_rank", "DF": "df_rank", "GK": "gk_rank"}
+UNDERRATED_COLUMNS = {"FWD": "fwd_underrated", "MF": "mf_underrated", "DF": "df_underrated", "GK": "gk_underrated"}
+UNDERRATED_RANK_COLUMNS = {"FWD": "fwd_underrated_rank", "MF": "mf_underrated_rank",
+                           "DF": "df_underrated_rank", "GK": "gk_underrated_rank"}
+
+# 0.7 * yellow cards/90 + 1.3 * red cards/90, built on the fly by feature_frame()
+DISCIPLINE = "discipline_90"
+
+# Role -> {feature column: weight}. Features a role does not list weigh 0.
+ROLE_WEIGHTS = {
+    "FWD": {
+        "Goals scored per 90 minutes": 0.40,
+        "npxg per 90 minutes": 0.15,
+        "xg per 90 minutes": 0.10,
+        "Assists per 90 minutes": 0.10,
+        "xag per 90 minutes": 0.10,
+        "prog_carries_90_any": 0.05,
+        "prog_passes_rec_90_any": 0.10,
+        DISCIPLINE: -0.05,
+    },
+    "MF": {
+        "mf_shot_creating_actions_90": 0.25,
+        "prog_passes_90_any": 0.20,
+        "prog_carries_90_any": 0.15,
+        "prog_passes_rec_90_any": 0.05,
+        "Assists per 90 minutes": 0.10,
+        "mf_passes_attempted_90": 0.10,
+        "mf_pass_completion_pct": 0.10,
+        "mf_tackles_90": 0.05,
+        "mf_interceptions_90": 0.05,
+    },
+    "DF": {
+        "df_interceptions_90": 0.20,
+        "df_tackles_90": 0.20,
+        "df_blocks_90": 0.15,
+        "df_clearances_90": 0.15,
+        "df_aerials_won_90": 0.15,
+        "df_progressive_passes_rec_90": 0.10,
+        DISCIPLINE: -0.05,
+    },
+    "GK": {
+        "gk_save_percentage": 0.40,
+        "gk_clean_sheet_percentage": 0.20,
+        "gk_crosses_stopped_pct": 0.10,
+        "gk_def_actions_outside_pen_area": 0.10,
+        "gk_avg_distance_of_def_actions": 0.05,
+        "gk_save_pct_penalty_kicks": 0.10,
+        "gk_psxg_per_sot": 0.05,
+    },
+}
+
+
+MARKET_VALUE_CANDIDATES = [
+    "market_value_eur", "Market value", "Market Value", "market value",
+    "TM_Market_Value", "tm_market_value", "value", "Value", "mv"
+]
+
+
+@dataclass(frozen=True)
+class RankingConfig:
+    min_90s: float = 20                  # eligibility floor for ranks and the z-score statistics
+    weights: dict = field(default_factory=lambda: ROLE_WEIGHTS)
+    max_age: int | None = None           # underrated ranks only for players younger than this ...
+    age_column: str = "age"              # ... by FBref's listed age, else the age at ref_date
+    ref_date: str = "2025-06-30"         # ages are computed at the end of the 2024/25 season
+
+
+@dataclass(frozen=True)
+class RoleOrder:
+    """
+    The rows of one role holding a rank for one metric, best first: row positions in the
+    ranked frame, their metric (descending) and their dense rank. Top-k is a slice;
+    rank and percentile of a metric value are a binary search.
+    """
+    ids: np.ndarray
+    values: np.ndarray
+    ranks: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def top(self, k: int) -> np.ndarray:
+        return self.ids[:k]
+
+    def through_rank(self, rank: float) -> np.ndarray:
+        """Row positions of every row ranked `rank` or better (ties included)."""
+        return self.ids[:np.searchsorted(self.ranks, rank, side="right")]
+
+    def rank_of(self, value: float) -> float:
+        """Dense rank of the ranked rows whose metric equals `value`; NaN if there are none."""
+        pos = np.searchsorted(-self.values, -value, side="left")
+        return float(self.ranks[pos]) if pos < len(self) and self.values[pos] == value else np.nan
+
+    def percentile(self, value: float) -> float:
+        """Share (0-100) of ranked rows with a lower metric than `value`."""
+        if not len(self) or np.isnan(value):
+            return np.nan
+        at_or_above = np.searchsorted(-self.values, -value, side="right")
+        return 100.0 * (len(self) - at_or_above) / len(self)
+
+
+def map_role(pos: str) -> str | None:
+    if not isinstance(pos, str):
+        return None
+    p = pos.lower()
+    if "goalkeeper" in p:
+        return "GK"
+    if any(k in p for k in ["centre-back", "right-back", "left-back"]):
+        return "DF"
+    if any(k in p for k in ["attacking midfield", "defensive midfield", "central midfield"]):
+        return "MF"
+    if any(k in p for k in ["left winger", "centre-forward", 'right winger']):
+        return "FWD"
+    return None
+
+
+def safe_div(num, den):
+    num = pd.to_numeric(num, errors="coerce")
+    den = pd.to_numeric(den, errors="coerce")
+    return np.where(den > 0, num / den, np.nan)
+
+
+def add_role_and_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add `role` and the derived per-90 inputs in place: prog_*_any prefer the scouting-report
+    value and fall back to season totals / 90s played; yc_90 and rc_90 are cards per 90.
+    """
+    def as_series(arr):
+        return pd.Series(arr, index=df.index, dtype="float64")
+
+    def col(name):
+        return pd.to_numeric(df.get(name), errors="coerce")
+
+    played = df["90s Played"]
+    df["role"] = df["Position"].astype(object).map(map_role)
+    df["prog_carries_90_any"] = as_series(col("mf_progressive_carries_90")).combine_first(
+        as_series(safe_div(df.get("Progressive Carries"), played)))
+    df["prog_passes_rec_90_any"] = (
+        as_series(col("mf_progressive_passes_rec_90"))
+        .combine_first(as_series(col("df_progressive_passes_rec_90")))
+        .combine_first(as_series(safe_div(df.get("Progressive Passes Received"), played)))
+    )
+    df["prog_passes_90_any"] = as_series(col("mf_progressive_passes_90")).combine_first(
+        as_series(safe_div(df.get("Progressive Passes"), played)))
+    df["yc_90"] = as_series(safe_div(df.get("Yellow Cards"), played))
+    df["rc_90"] = as_series(safe_div(df.get("Red Cards"), played))
+    return df
+
+
+def weight_matrix(weights: dict = ROLE_WEIGHTS) -> pd.DataFrame:
+    """Features x roles matrix of weights, in first-seen feature order."""
+    features = list(dict.fromkeys(f for role in ROLES for f in weights.get(role, {})))
+    return pd.DataFrame(
+        {role: [weights.get(role, {}).get(f, 0.0) for f in features] for role in ROLES},
+        index=features, dtype="float64",
+    )
+
+
+def feature_frame(df: pd.DataFrame, features) -> pd.DataFrame:
+    """Numeric frame of the scoring features; DISCIPLINE is derived from yc_90/rc_90."""
+    cols = {}
+    for f in features:
+        if f == DISCIPLINE:
+            cols[f] = 0.7 * df["yc_90"] + 1.3 * df["rc_90"]
+        else:
+            cols[f] = pd.to_numeric(df[f], errors="coerce")
+    return pd.DataFrame(cols, index=df.index, dtype="float64")
+
+
+def standardize_by_role(X: pd.DataFrame, role: pd.Series, eligible: pd.Series) -> pd.DataFrame:
+    """
+    Z-score every column of X within each role, using only eligible rows for the mean
+    and (population) std. Ineligible rows, missing values and zero-spread columns give 0.
+    """
+    mask = eligible.fillna(False).astype(bool) & role.isin(ROLES)
+    grouped = X[mask].groupby(role[mask])
+    mu = grouped.mean()
+    sd = grouped.std(ddof=0)
+    sd = sd.where(~np.isclose(sd, 0.0))
+
+    z = pd.DataFrame(np.nan, index=X.index, columns=X.columns)
+    keys = role[mask]
+    z.loc[mask] = (X[mask].to_numpy() - mu.reindex(keys).to_numpy()) / sd.reindex(keys).to_numpy()
+    return z.fillna(0.0)
+
+
+def role_scores(df: pd.DataFrame, role: pd.Series, eligible: pd.Series,
+                weights: dict = ROLE_WEIGHTS) -> pd.DataFrame:
+    """
+    Score every row under every role's weights in one pass: standardize all features once,
+    then a single (rows x features) @ (features x roles) product. Columns are ROLES.
+    """
+    W = weight_matrix(weights)
+    z = standardize_by_role(feature_frame(df, W.index), role, eligible)
+    return pd.DataFrame(z.to_numpy() @ W.to_numpy(), index=df.index, columns=W.columns)
+
+
+def dense_rank_order(values: np.ndarray, ok: np.ndarray, positions: np.ndarray) -> tuple[np.ndarray, RoleOrder]:
+    """
+    Dense descending ranks of `values` (NaN stays unranked, ties share a rank, equal values
+    keep row order) from a single sort, plus the RoleOrder of the rows where `ok` holds.
+    """
+    present = np.flatnonzero(~np.isnan(values))
+    order = present[np.argsort(-values[present], kind="stable")]
+    v = values[order]
+    dense = np.cumsum(np.r_[True, v[1:] != v[:-1]]).astype(float) if len(v) else np.empty(0)
+    rank = np.full(len(values), np.nan)
+    rank[order] = dense
+    keep = ok[order]
+    return rank, RoleOrder(positions[order[keep]], v[keep], dense[keep])
+
+
+def rank_roles(df: pd.DataFrame, min_90s: float, roles=ROLES, max_age: int | None = None,
+               age_column: str = "_age_at_ref", orders: dict | None = None) -> pd.DataFrame:
+    """
+    Fill the rank, underrated (score / market value) and underrated-rank columns for the rows
+    of `roles`, in place. Ranks are dense and descending within a role; players under
+    `min_90s` get no rank, and no underrated rank without a market value (or, with
+    `max_age`, unless `age_column` says they are younger). The output columns must already exist.
+    Pass a dict as `orders` to receive a RoleOrder per filled rank column.
+    """
+    played = df["90s Played"]
+    ranked_ok = played.notna() & (played >= min_90s)
+    underrated_ok = ranked_ok & df["_market_value_eur"].notna()
+    if max_age is not None:
+        underrated_ok &= (listed_age(df[age_column]) < max_age).fillna(False).astype(bool)
+    ranked_ok, underrated_ok = ranked_ok.to_numpy(), underrated_ok.to_numpy()
+    for role in roles:
+        rows = (df["role"] == role).to_numpy()
+        positions = np.flatnonzero(rows)
+        score = df.loc[rows, SCORE_COLUMNS[role]].to_numpy(float)
+        rank, order = dense_rank_order(score, ranked_ok[rows], positions)
+        df.loc[rows, RANK_COLUMNS[role]] = np.where(ranked_ok[rows], rank, np.nan)
+        underrated = score / df.loc[rows, "_market_value_eur"].to_numpy(float)
+        df.loc[rows, UNDERRATED_COLUMNS[role]] = underrated
+        u_rank, u_order = dense_rank_order(underrated, underrated_ok[rows], positions)
+        df.loc[rows, UNDERRATED_RANK_COLUMNS[role]] = np.where(underrated_ok[rows], u_rank, np.nan)
+        if orders is not None:
+            orders[RANK_COLUMNS[role]], orders[UNDERRATED_RANK_COLUMNS[role]] = order, u_order
+    return df
+
+
+def ranked_orders(df: pd.DataFrame) -> dict:
+    """Rebuild the RoleOrder of every rank column from an already ranked frame (e.g. read back from disk)."""
+    orders = {}
+    for role in ROLES:
+        for rank_col, value_col in [(RANK_COLUMNS[role], SCORE_COLUMNS[role]),
+                                    (UNDERRATED_RANK_COLUMNS[role], UNDERRATED_COLUMNS[role])]:
+            rank = df[rank_col].to_numpy(float)
+            ids = np.flatnonzero(~np.isnan(rank))
+            ids = ids[np.argsort(rank[ids], kind="stable")]
+            orders[rank_col] = RoleOrder(ids, df[value_col].to_numpy(float)[ids], rank[ids])
+    return orders
+
+
+def rank_players(df: pd.DataFrame, config: RankingConfig = RankingConfig(), return_orders: bool = False):
+    """
+    Score and rank a merged squad table (all_squads columns). Returns a new frame with the
+    role, derived features, parsed Transfermarkt columns, and the score/rank/underrated
+    columns added; `df` itself is left untouched and nothing is read or written.
+    With `return_orders`, returns (frame, orders): a RoleOrder per rank column, by row position.
+    """
+    mv_col = next((c for c in MARKET_VALUE_CANDIDATES if c in df.columns), None)
+    if mv_col is None:
+        raise KeyError("No market value column found. Add one of: " + ", ".join(MARKET_VALUE_CANDIDATES))
+
+    df = df.copy()
+    df["90s Played"] = pd.to_numeric(df["90s Played"], errors="coerce")
+    add_role_and_features(df)
+
+    scores = role_scores(df, df["role"], df["90s Played"] >= config.min_90s, config.weights)
+    for role, score_col in SCORE_COLUMNS.items():
+        df[score_col] = np.where(df["role"] == role, scores[role], np.nan)
+    for rank_col in RANK_COLUMNS.values():
+        df[rank_col] = np.nan
+
+    add_parsed_columns(df, config.ref_date, mv_col=mv_col)
+    df.loc[~(df["_market_value_eur"] > 0), "_market_value_eur"] = np.nan
+
+    for col in list(UNDERRATED_COLUMNS.values()) + list(UNDERRATED_RANK_COLUMNS.values()):
+        df[col] = np.nan
+    age_column = config.age_column if config.age_column in df.columns else "_age_at_ref"
+    orders = {}
+    rank_roles(df, config.min_90s, max_age=config.max_age, age_column=age_column, orders=orders)
+    return (df, orders) if return_orders else df
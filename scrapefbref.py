@@ -1,51 +1,149 @@
 # pip install selenium beautifulsoup4 pandas lxml
 
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup, Comment
+from selenium.common.exceptions import TimeoutException
+from bs4 import BeautifulSoup
 import pandas as pd
 import time, re, os
+import argparse
 from collections import defaultdict
 
+import metrics
+from browser import make_driver
+from checkpoint import Journal
+from fetchpool import HostRateLimiter, fetch_limited, fetch_pages, is_rate_limited
+from jobqueue import JobQueue
+from leagues import SEASON, fbref_squad_url, output_dir
+from mergecsv import fold_accents
+from pagecache import PageCache
+from snapshot import RecordingCache, ReplaySource, SnapshotReader, SnapshotWriter
+
+# club -> (FBref squad id, URL name)
 CLUBS = {
-    "Barcelona": "https://fbref.com/en/squads/206d90db/2024-2025/all_comps/Barcelona-Stats-All-Competitions",
-    "Real Madrid": "https://fbref.com/en/squads/53a2f082/2024-2025/all_comps/Real-Madrid-Stats-All-Competitions",
-    "Liverpool": "https://fbref.com/en/squads/822bd0ba/2024-2025/all_comps/Liverpool-Stats-All-Competitions",
-    "Arsenal": "https://fbref.com/en/squads/18bb7c10/2024-2025/all_comps/Arsenal-Stats-All-Competitions",
-    "PSG": "https://fbref.com/en/squads/e2d8892c/2024-2025/all_comps/Paris-Saint-Germain-Stats-All-Competitions",
+    "Barcelona": ("206d90db", "Barcelona"),
+    "Real Madrid": ("53a2f082", "Real-Madrid"),
+    "Liverpool": ("822bd0ba", "Liverpool"),
+    "Arsenal": ("18bb7c10", "Arsenal"),
+    "PSG": ("e2d8892c", "Paris-Saint-Germain"),
 }
-OUTPUT_DIR = "outputs"
-CHROMEDRIVER_PATH = r"C:\Users\Lenovo\Downloads\chromedriver-win64\chromedriver-win64\chromedriver.exe"
+CACHE_DIR = os.path.join("cache", "pages")
+CHECKPOINT_DIR = os.path.join("cache", "checkpoints")   # per-club journals of finished players
+PROFILE_WORKERS = 4         # headless drivers fetching player profiles (1 = serial on the main driver)
+PROFILE_MAX_PER_SEC = 1.0   # starting rate of requests per second to fbref.com ...
+PROFILE_RATE_CEILING = 2.0  # ... which the limiter raises while pages come back clean, up to this
+
+# squad-page tables by FBref's stat-type name (all competitions combined)
+SQUAD_TABLE_IDS = {kind: f"stats_{kind}_combined"
+                   for kind in ["standard", "keeper", "keeper_adv", "defense", "passing", "gca", "possession", "misc"]}
+
+# --squad-tables: each role column from a squad table cell (by data-stat), divided by that
+# row's 90s when per_90 is set; rates and percentages are taken as they are.
+SQUAD_STAT_SOURCES = {  # column: (table, data-stat, per_90)
+    "df_progressive_passes_rec_90": ("possession", "progressive_passes_received", True),
+    "df_tackles_90": ("defense", "tackles", True),
+    "df_interceptions_90": ("defense", "interceptions", True),
+    "df_blocks_90": ("defense", "blocks", True),
+    "df_clearances_90": ("defense", "clearances", True),
+    "df_aerials_won_90": ("misc", "aerials_won", True),
+    "mf_shot_creating_actions_90": ("gca", "sca", True),
+    "mf_passes_attempted_90": ("passing", "passes", True),
+    "mf_pass_completion_pct": ("passing", "passes_pct", False),
+    "mf_progressive_passes_90": ("passing", "progressive_passes", True),
+    "mf_progressive_carries_90": ("possession", "progressive_carries", True),
+    "mf_progressive_passes_rec_90": ("possession", "progressive_passes_received", True),
+    "mf_tackles_90": ("defense", "tackles", True),
+    "mf_interceptions_90": ("defense", "interceptions", True),
+    "mf_blocks_90": ("defense", "blocks", True),
+    "mf_clearances_90": ("defense", "clearances", True),
+    "mf_aerials_won_90": ("misc", "aerials_won", True),
+    "gk_save_percentage": ("keeper", "gk_save_pct", False),
+    "gk_psxg_per_sot": ("keeper_adv", "gk_psnpxg_per_shot_on_target_against", False),
+    "gk_save_pct_penalty_kicks": ("keeper", "gk_pens_save_pct", False),
+    "gk_clean_sheet_percentage": ("keeper", "gk_clean_sheets_pct", False),
+    "gk_crosses_stopped_pct": ("keeper_adv", "gk_crosses_stopped_pct", False),
+    "gk_def_actions_outside_pen_area": ("keeper_adv", "gk_def_actions_outside_pen_area_per90", False),
+    "gk_avg_distance_of_def_actions": ("keeper_adv", "gk_avg_distance_def_actions", False),
+}
+SQUAD_STAT_TABLES = list(dict.fromkeys(kind for kind, _, _ in SQUAD_STAT_SOURCES.values()))
+
 
+# one limiter for the whole run: the club page, the serial path and the profile pool share fbref.com's budget
+LIMITER = HostRateLimiter(PROFILE_MAX_PER_SEC, max_per_sec=PROFILE_RATE_CEILING)
 
-opts = Options()
 
-opts.add_argument("--log-level=3")
-opts.add_experimental_option("excludeSwitches", ["enable-logging", "enable-automation"])
-opts.add_experimental_option("prefs", {"profile.default_content_setting_values.notifications": 2})
-service = Service(executable_path=CHROMEDRIVER_PATH)
+def load_profile_page(driver: webdriver.Chrome, player_url: str) -> str:
+    driver.get(player_url)
+    try:
+        WebDriverWait(driver, 6).until(EC.presence_of_element_located((By.CSS_SELECTOR, "body")))
+    except TimeoutException:
+        metrics.incr("timeouts")
+    except Exception:
+        pass
+    return driver.page_source
+
+
+def load_club_page(driver: webdriver.Chrome, club_url: str) -> str:
+    """The club page once its standard stats table is there; a throttled page is returned as is."""
+    driver.get(club_url)
+    with metrics.span("fbref.consent"):
+        try:
+            consent = WebDriverWait(driver, 5).until(
+                EC.element_to_be_clickable((
+                    By.XPATH,
+                    "//*[self::button or self::a][contains(translate(normalize-space(.),"
+                    "'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'accept')]"
+                ))
+            )
+            consent.click()
+            time.sleep(0.4)
+        except TimeoutException:
+            metrics.incr("timeouts")
+        except Exception:
+            pass
+
+    with metrics.span("fbref.wait_table"):
+        try:
+            WebDriverWait(driver, 20).until(
+                lambda d: d.find_elements(By.XPATH, "//*[@id='stats_standard_combined' or @id='all_stats_standard_combined']")
+                or is_rate_limited(d.page_source)
+            )
+        except TimeoutException:
+            metrics.incr("timeouts")   # no table: the caller reports it
+    return driver.page_source
+
+
+def find_tables_from_page_source(html: str, table_ids) -> dict:
+    """
+    {table_id: <table> or None} for each requested id, from one scan of the raw HTML.
+    FBref ships most tables inside comments, but a comment's text is still the table's
+    markup, so matching the opening tag finds it either way; only the matched
+    <table>...</table> fragments are parsed.
+    """
+    table_ids = list(dict.fromkeys(table_ids))
+    found = dict.fromkeys(table_ids)
+    opening = re.compile(r"""<table\b[^>]*?\bid=["'](%s)["']""" % "|".join(map(re.escape, table_ids)))
+    pending = len(table_ids)
+    for m in opening.finditer(html):
+        table_id = m.group(1)
+        if found[table_id] is not None:
+            continue
+        end = html.find("</table>", m.end())
+        if end < 0:
+            continue
+        fragment = html[m.start():end + len("</table>")]
+        found[table_id] = BeautifulSoup(fragment, "lxml").find("table", id=table_id)
+        pending -= found[table_id] is not None
+        if not pending:
+            break
+    return found
 
 
 def find_table_from_page_source(html, table_id):
     """Return <table> either directly or from FBref's comment wrapper."""
-    soup = BeautifulSoup(html, "lxml")
-    table = soup.find("table", id=table_id)
-    if table:
-        return table
-    wrapper = soup.find("div", id=f"all_{table_id}")
-    if not wrapper:
-        return None
-    for child in wrapper.children:
-        if isinstance(child, Comment) and "table" in child:
-            inner = BeautifulSoup(child, "lxml")
-            table = inner.find("table", id=table_id)
-            if table:
-                return table
-    return None
+    return find_tables_from_page_source(html, [table_id])[table_id]
 
 def classify_role(pos_text: str) -> str | None:
     """Map position text to 'midfielder' | 'defender' | 'goalkeeper' | None (attackers)."""
@@ -96,9 +194,25 @@ GOALKEEPER_LABELS = {
     "gk_avg_distance_of_def_actions": {"avgdistanceofdefactions"},
 }
 
-def parse_scouting_per90(profile_html: str, desired_map: dict[str, set[str]]) -> dict:
-    """Parse Scouting Report tables on a player page; return Per-90 dict for desired labels."""
-    soup = BeautifulSoup(profile_html, "lxml")
+ROLE_LABELS = {
+    "defender": DEFENDER_LABELS,
+    "midfielder": MIDFIELDER_LABELS,
+    "goalkeeper": GOALKEEPER_LABELS,
+}
+
+def build_label_index(desired_map: dict[str, set[str]]) -> dict[str, list[str]]:
+    """Invert {column: {normalized labels}} into {normalized label: [columns]}."""
+    index = defaultdict(list)
+    for out_col, synset in desired_map.items():
+        for label in synset:
+            index[label].append(out_col)
+    return dict(index)
+
+ROLE_LABEL_INDEX = {role: build_label_index(labels) for role, labels in ROLE_LABELS.items()}
+
+
+def _scouting_per90_from_soup(soup: BeautifulSoup, desired_map: dict[str, set[str]],
+                              label_index: dict[str, list[str]]) -> dict:
     out = {col: "" for col in desired_map.keys()}
     tables = soup.select("table.stats_table")
     for tb in tables:
@@ -113,18 +227,75 @@ def parse_scouting_per90(profile_html: str, desired_map: dict[str, set[str]]) ->
             continue
         for tr in tbody.find_all("tr"):
             stat_th = tr.find("th")
-            tds = tr.find_all("td")
-            if not stat_th or len(tds) < 1:
+            if not stat_th:
+                continue
+            out_cols = label_index.get(_norm_label(stat_th.get_text(strip=True)))
+            if not out_cols:
+                continue
+            td = tr.find("td")
+            if td is None:
                 continue
-            label = _norm_label(stat_th.get_text(strip=True))
-            per90 = tds[0].get_text(strip=True)  # first td is Per 90
-            for out_col, synset in desired_map.items():
-                if label in synset and not out[out_col]:
+            per90 = td.get_text(strip=True)  # first td is Per 90
+            for out_col in out_cols:
+                if not out[out_col]:
                     out[out_col] = per90
         if all(out[v] != "" for v in out):
             break
     return out
 
+def parse_scouting_per90(profile_html: str, desired_map: dict[str, set[str]]) -> dict:
+    """Parse Scouting Report tables on a player page; return Per-90 dict for desired labels."""
+    soup = BeautifulSoup(profile_html, "lxml")
+    return _scouting_per90_from_soup(soup, desired_map, build_label_index(desired_map))
+
+def extract_profile(profile_html: str, role: str | None) -> tuple[list[str], dict]:
+    """Parse a player page once; return its #bling trophies and the Per-90 stats for `role`."""
+    soup = BeautifulSoup(profile_html, "lxml")
+    trophies = []
+    bling_ul = soup.find("ul", id="bling")
+    if bling_ul:
+        trophies = [li.get_text(strip=True) for li in bling_ul.find_all("li", class_="important poptip")]
+    stats = {}
+    if role in ROLE_LABELS:
+        stats = _scouting_per90_from_soup(soup, ROLE_LABELS[role], ROLE_LABEL_INDEX[role])
+    return trophies, stats
+
+def squad_table_rows(table) -> dict:
+    """{player url (or name): {data-stat: text}} for the player rows of a squad table."""
+    out = {}
+    for tr in table.find("tbody").find_all("tr"):
+        if "thead" in tr.get("class", []):
+            continue
+        first = tr.find("th")
+        if not first:
+            continue
+        link = first.find("a", href=True)
+        key = "https://fbref.com" + link["href"] if link else first.get_text(strip=True)
+        out[key] = {td["data-stat"]: td.get_text(strip=True) for td in tr.find_all("td") if td.has_attr("data-stat")}
+    return out
+
+
+def _number(text) -> float | None:
+    try:
+        return float(str(text).replace(",", "").replace("%", ""))
+    except ValueError:
+        return None
+
+
+def squad_role_stats(squad_rows: dict, key: str, role: str | None) -> dict:
+    """The role's columns for one player from the squad tables (squad_table_rows per table kind)."""
+    stats = {}
+    for col in ROLE_LABELS.get(role, {}):
+        kind, stat, per_90 = SQUAD_STAT_SOURCES[col]
+        row = squad_rows.get(kind, {}).get(key, {})
+        value = _number(row.get(stat, ""))
+        if value is not None and per_90:
+            played = _number(row.get("minutes_90s", ""))
+            value = value / played if played else None
+        stats[col] = "" if value is None else (f"{value:.2f}" if per_90 else row[stat])
+    return stats
+
+
 def maybe_to_numeric(s: pd.Series) -> pd.Series:
     if s.dtype != object:
         return s
@@ -138,36 +309,47 @@ def maybe_to_numeric(s: pd.Series) -> pd.Series:
     return converted if converted.notna().mean() >= 0.6 else s
 
 def slugify(name: str) -> str:
-    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
-
-
-def scrape_fbref_club(driver: webdriver.Chrome, club_name: str, club_url: str) -> pd.DataFrame:
+    # accents folded, not dropped: mergecsv rebuilds the club key from the file name ("Atlético" -> atletico)
+    return re.sub(r"[^a-z0-9]+", "_", fold_accents(name).lower()).strip("_")
+
+
+def scrape_fbref_club(driver: webdriver.Chrome | None, club_name: str, club_url: str,
+                      workers: int = PROFILE_WORKERS, cache: PageCache | None = None,
+                      resume: bool = False, squad_tables: bool = False, profiles: bool = True,
+                      season: int = SEASON) -> pd.DataFrame:
+    """
+    Scrape one squad. Every finished player is journaled to CHECKPOINT_DIR/<club>_<season>.jsonl;
+    with resume=True players already in the journal are not fetched again.
+    squad_tables=True takes the df_/mf_/gk_ columns from the club page's squad tables
+    instead of each player's scouting report; player pages are then only read for
+    achievements, and profiles=False skips them altogether.
+    """
     base_url = "https://fbref.com"
-    driver.get(club_url)
-
-
-    try:
-        consent = WebDriverWait(driver, 5).until(
-            EC.element_to_be_clickable((
-                By.XPATH,
-                "//*[self::button or self::a][contains(translate(normalize-space(.),"
-                "'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'accept')]"
-            ))
-        )
-        consent.click()
-        time.sleep(0.4)
-    except Exception:
-        pass
-
-
-    WebDriverWait(driver, 20).until(
-        EC.presence_of_element_located(
-            (By.XPATH, "//*[@id='stats_standard_combined' or @id='all_stats_standard_combined']")
-        )
-    )
-    table = find_table_from_page_source(driver.page_source, "stats_standard_combined")
+    club_html = cache.get(club_url) if cache else None
+    if club_html is None:
+        with metrics.span("fbref.club_get"):
+            club_html = fetch_limited(driver, club_url, load_club_page, LIMITER)
+        fetched = True
+    else:
+        fetched = False
+        metrics.incr("cache_hits")
+    metrics.incr("bytes_parsed", len(club_html))
+    with metrics.span("fbref.find_table"):
+        kinds = ["standard"] + (SQUAD_STAT_TABLES if squad_tables else [])
+        found = find_tables_from_page_source(club_html, [SQUAD_TABLE_IDS[k] for k in kinds])
+    table = found[SQUAD_TABLE_IDS["standard"]]
     if table is None:
         raise RuntimeError(f"Could not locate the 'stats_standard_combined' table for {club_name}.")
+    if fetched and cache:
+        cache.put(club_url, club_html)   # only pages that have the table are kept
+    squad_rows = {}
+    if squad_tables:
+        with metrics.span("fbref.parse_squad_tables"):
+            squad_rows = {k: squad_table_rows(found[SQUAD_TABLE_IDS[k]]) for k in SQUAD_STAT_TABLES
+                          if found[SQUAD_TABLE_IDS[k]] is not None}
+        missing_tables = [SQUAD_TABLE_IDS[k] for k in SQUAD_STAT_TABLES if k not in squad_rows]
+        if missing_tables:
+            print(f"{club_name}: no {', '.join(missing_tables)} on the club page; those columns stay empty")
 
 
     thead_rows = table.find("thead").find_all("tr")
@@ -198,7 +380,7 @@ def scrape_fbref_club(driver: webdriver.Chrome, club_name: str, club_url: str) -
     }
 
     tbody = table.find("tbody")
-    profile_cache_html = {}
+    players = []  # (player_url, role) per row, in table order
 
     for tr in tbody.find_all("tr"):
         if "class" in tr.attrs and "thead" in tr["class"]:
@@ -219,43 +401,76 @@ def scrape_fbref_club(driver: webdriver.Chrome, club_name: str, club_url: str) -
         if len(cells) < len(uniq_headers):
             cells += [""] * (len(uniq_headers) - len(cells))
         rows.append(cells[:len(uniq_headers)])
+        players.append((player_url, role))
 
+    journal = Journal(os.path.join(CHECKPOINT_DIR, f"{slugify(club_name)}_{season}.jsonl"), resume=resume)
+    keys = [player_url or f"row:{i}:{row[0]}" for i, ((player_url, _), row) in enumerate(zip(players, rows))]
+    if journal.done:
+        print(f"Resuming: {sum(k in journal.done for k in keys)}/{len(keys)} players already journaled")
 
+    profile_cache_html = {}
+    if cache and profiles:
+        for u, _ in players:
+            if u and u not in profile_cache_html and u not in journal.done:
+                html = cache.get(u)
+                if html is not None:
+                    profile_cache_html[u] = html
+        metrics.incr("cache_hits", len(profile_cache_html))
+    def finish(i: int, profile_html: str | None):
+        """Parse row i's profile (None: none to read) and journal the player."""
+        player_url, role = players[i]
         trophies = []
         role_data = {k: "" for k in extra_cols}
-
-        if player_url:
-            if player_url in profile_cache_html:
-                profile_html = profile_cache_html[player_url]
-            else:
-                driver.get(player_url)
-                try:
-                    WebDriverWait(driver, 6).until(EC.presence_of_element_located((By.CSS_SELECTOR, "body")))
-                except Exception:
-                    pass
-                profile_html = driver.page_source
-                profile_cache_html[player_url] = profile_html
-
-            psoup = BeautifulSoup(profile_html, "lxml")
-            bling_ul = psoup.find("ul", id="bling")
-            if bling_ul:
-                trophies = [li.get_text(strip=True) for li in bling_ul.find_all("li", class_="important poptip")]
-
-            if role == "defender":
-                stats = parse_scouting_per90(profile_html, DEFENDER_LABELS)
-                for k in DEFENDER_LABELS: role_data[k] = stats.get(k, "")
-            elif role == "midfielder":
-                stats = parse_scouting_per90(profile_html, MIDFIELDER_LABELS)
-                for k in MIDFIELDER_LABELS: role_data[k] = stats.get(k, "")
-            elif role == "goalkeeper":
-                stats = parse_scouting_per90(profile_html, GOALKEEPER_LABELS)
-                for k in GOALKEEPER_LABELS: role_data[k] = stats.get(k, "")
-
-        achievements_list.append(", ".join(trophies))
-        for k in extra_cols: extra_cols[k].append(role_data.get(k, ""))
-
-        time.sleep(0.25)
-
+        if squad_tables:
+            role_data.update(squad_role_stats(squad_rows, player_url or rows[i][0], role))
+        if profile_html is not None:
+            metrics.incr("bytes_parsed", len(profile_html))
+            with metrics.span("fbref.parse_profile"):
+                trophies, stats = extract_profile(profile_html, None if squad_tables else role)
+            role_data.update(stats)
+        journal.append(keys[i], cells=rows[i], achievements=", ".join(trophies),
+                       extra={k: role_data.get(k, "") for k in extra_cols})
+
+    def is_done(i: int) -> bool:
+        done = journal.done.get(keys[i])
+        return done is not None and len(done["cells"]) == len(uniq_headers)
+
+    if workers > 1 and profiles:
+        missing = list(dict.fromkeys(u for u, _ in players
+                                     if u and u not in profile_cache_html and u not in journal.done))
+        rows_of = defaultdict(list)
+        for i, (u, _) in enumerate(players):
+            rows_of[u].append(i)
+
+        def on_page(u, html):
+            # cache and journal each profile as it lands, so a crash mid-pool keeps what was fetched
+            if cache:
+                cache.put(u, html)
+            for i in rows_of[u]:
+                if not is_done(i):
+                    finish(i, html)
+
+        with metrics.span("fbref.profile_pool"):
+            fetch_pages(missing, make_driver, load_profile_page, workers=workers, limiter=LIMITER, on_page=on_page)
+
+    for i, (player_url, role) in enumerate(players):
+        if not is_done(i):
+            profile_html = None
+            if player_url and profiles:
+                if player_url in profile_cache_html:
+                    profile_html = profile_cache_html[player_url]
+                else:
+                    profile_html = fetch_limited(driver, player_url, load_profile_page, LIMITER)
+                    profile_cache_html[player_url] = profile_html
+                    if cache:
+                        cache.put(player_url, profile_html)
+            finish(i, profile_html)
+        done = journal.done[keys[i]]
+        rows[i] = done["cells"]
+        achievements_list.append(done["achievements"])
+        for k in extra_cols: extra_cols[k].append(done["extra"].get(k, ""))
+
+    journal.close()
     df = pd.DataFrame(rows, columns=uniq_headers)
     df["achievements"] = achievements_list
     for k, v in extra_cols.items():
@@ -292,21 +507,81 @@ def scrape_fbref_club(driver: webdriver.Chrome, club_name: str, club_url: str) -
 
     return df
 
+def scrape_to_csv(driver, club: str, url: str, out_name: str, cache=None, resume: bool = False,
+                  squad_tables: bool = False, profiles: bool = True, season: int = SEASON) -> int:
+    print(f"\n--- Scraping {club} ---")
+    df = scrape_fbref_club(driver, club, url, cache=cache, resume=resume, squad_tables=squad_tables,
+                           profiles=profiles, season=season)
+    os.makedirs(output_dir(season), exist_ok=True)
+    out_path = os.path.join(output_dir(season), out_name)
+    df.to_csv(out_path, index=False, encoding="utf-8-sig")
+    print(f"Saved {len(df)} rows → {out_path}")
+    return len(df)
+
+def drain_queue(db_path, driver, cache=None, resume: bool = False, **modes):
+    """
+    Scrape every pending FBref job of a crawl queue, recording each outcome in the queue.
+    A retried job always resumes from its club's journal.
+    """
+    jobs = JobQueue(db_path)
+    requeued = jobs.requeue_running("fbref")
+    if requeued:
+        print(f"Requeued {requeued} jobs left running by an earlier run")
+    try:
+        while (job := jobs.claim("fbref")) is not None:
+            try:
+                rows = scrape_to_csv(driver, job["club"], job["url"], job["out"], cache,
+                                     resume=resume or job["attempts"] > 1, season=job["season"], **modes)
+                jobs.done(job["id"], rows)
+            except Exception as e:
+                print(f"{job['club']} failed: {e!r}")
+                jobs.fail(job["id"], repr(e))
+        print("Queue:", jobs.counts().get("fbref", {}))
+    finally:
+        jobs.close()
+
 def main():
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    driver = webdriver.Chrome(service=service, options=opts)
-    driver.set_window_size(1600, 1000)
+    ap = argparse.ArgumentParser(description="Scrape FBref squad stats and player profiles.")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument("--record", metavar="BUNDLE", help="archive every page seen into a snapshot bundle (.zip)")
+    mode.add_argument("--replay", metavar="BUNDLE", help="parse pages from a snapshot bundle; no browser is started")
+    ap.add_argument("--resume", action="store_true",
+                    help="skip players already journaled by an interrupted run and rebuild from the journal")
+    ap.add_argument("--queue", metavar="DB", help="drain the FBref jobs of a crawl queue (crawl.py) instead of CLUBS")
+    ap.add_argument("--squad-tables", action="store_true",
+                    help="derive the df_/mf_/gk_ per-90 columns from the club page's squad tables")
+    ap.add_argument("--no-profiles", action="store_true",
+                    help="skip player pages: no achievements (and no role stats without --squad-tables)")
+    ap.add_argument("--season", type=int, default=SEASON,
+                    help="season start year (2024 = 2024/25); a queue's jobs carry their own")
+    args = ap.parse_args()
+    modes = {"squad_tables": args.squad_tables, "profiles": not args.no_profiles}
+
+    driver, writer = None, None
+    if args.replay:
+        cache = ReplaySource(SnapshotReader(args.replay))
+    else:
+        driver = make_driver()
+        cache = PageCache(CACHE_DIR)
+        if args.record:
+            writer = SnapshotWriter(args.record)
+            cache = RecordingCache(writer, cache)
 
     try:
-        for club, url in CLUBS.items():
-            print(f"\n--- Scraping {club} ---")
-            df = scrape_fbref_club(driver, club, url)
-            out_name = f"{slugify(club)}_fbref.csv"
-            out_path = os.path.join(OUTPUT_DIR, out_name)
-            df.to_csv(out_path, index=False, encoding="utf-8-sig")
-            print(f"Saved {len(df)} rows → {out_path}")
+        if args.queue:
+            drain_queue(args.queue, driver, cache, resume=args.resume, **modes)
+        else:
+            for club, (squad_id, name_slug) in CLUBS.items():
+                scrape_to_csv(driver, club, fbref_squad_url(squad_id, name_slug, args.season), f"{slugify(club)}_fbref.csv",
+                              cache, resume=args.resume, season=args.season, **modes)
     finally:
-        driver.quit()
+        if driver is not None:
+            driver.quit()
+        if writer is not None:
+            writer.close()
+        print("Page cache:", cache.stats())
+        print("Rate limiter:", LIMITER.stats())
+        metrics.export("scrapefbref")
 
 if __name__ == "__main__":
     main()
@@ -1,48 +1,54 @@
 # scrape_transfermarkt_all.py
 # pip install selenium pandas
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
+from lxml import html as lxml_html
 import pandas as pd
-import time, subprocess, os
+import time, os
+import argparse, queue
+import multiprocessing as mp
 from pathlib import Path
 
+import metrics
+from browser import make_driver
+from jobqueue import JobQueue
+from leagues import SEASON, output_dir, tm_squad_url
+from pagecache import PageCache
+from snapshot import RecordingCache, ReplaySource, SnapshotReader, SnapshotWriter
 
-CHROMEDRIVER_PATH = r"C:\Users\Lenovo\Downloads\chromedriver-win64\chromedriver-win64\chromedriver.exe"
 
 CLUBS = [
     {
         "name": "Barcelona",
         "league": "La Liga",
-        "url": "https://www.transfermarkt.co.uk/fc-barcelona/kader/verein/131/plus/1/galerie/0?saison_id=2024",
+        "tm": ("fc-barcelona", "131"),   # squad URL slug and club id
         "csv": "barcelonatransfermarket.csv",
     },
     {
         "name": "Real Madrid",
         "league": "La Liga",
-        "url": "https://www.transfermarkt.co.uk/real-madrid/kader/verein/418/plus/1/galerie/0?saison_id=2024",
+        "tm": ("real-madrid", "418"),
         "csv": "realmadridtransfermarket.csv",
     },
     {
         "name": "Liverpool",
         "league": "Premier League",
-        "url": "https://www.transfermarkt.co.uk/fc-liverpool/kader/verein/31/plus/1/galerie/0?saison_id=2024",
+        "tm": ("fc-liverpool", "31"),
         "csv": "liverpooltransfermarket.csv",
     },
     {
         "name": "Arsenal",
         "league": "Premier League",
-        "url": "https://www.transfermarkt.co.uk/fc-arsenal/kader/verein/11/plus/1/galerie/0?saison_id=2024",
+        "tm": ("fc-arsenal", "11"),
         "csv": "arsenaltransfermarket.csv",
     },
     {
         "name": "PSG",
         "league": "Ligue 1",
-        "url": "https://www.transfermarkt.co.uk/paris-saint-germain/kader/verein/583/plus/1/galerie/0?saison_id=2024",
+        "tm": ("paris-saint-germain", "583"),
         "csv": "psgtransfermarket.csv",
     },
 ]
@@ -56,18 +62,12 @@ def resolve_project_root() -> Path:
     return p
 
 PROJECT_ROOT = resolve_project_root()
-OUTPUT_DIR = PROJECT_ROOT / "outputs"
+OUTPUT_ROOT = PROJECT_ROOT / "outputs"   # CSVs go to outputs/season=<season>/
+CACHE_DIR = PROJECT_ROOT / "cache" / "pages"
+MAX_WORKERS = 4   # default concurrency limit for run_parallel
 
 
 
-def make_driver():
-    opts = Options()
-    # opts.add_argument("--headless=new")  # uncomment for headless
-    opts.add_argument("--log-level=3")
-    opts.add_experimental_option("excludeSwitches", ["enable-logging"])
-    service = Service(executable_path=CHROMEDRIVER_PATH, log_output=subprocess.DEVNULL)
-    return webdriver.Chrome(service=service, options=opts)
-
 def accept_popup(driver):
     try:
         WebDriverWait(driver, 5).until(EC.presence_of_all_elements_located((By.TAG_NAME, "iframe")))
@@ -83,18 +83,72 @@ def accept_popup(driver):
                 clicked = True
                 print("Popup accepted.")
                 break
-            except Exception:
+            except Exception as e:
+                if isinstance(e, TimeoutException):
+                    metrics.incr("timeouts")
                 driver.switch_to.default_content()
                 continue
         driver.switch_to.default_content()
         if not clicked:
             print("Popup not found — maybe already dismissed.")
-    except Exception:
+    except Exception as e:
+        if isinstance(e, TimeoutException):
+            metrics.incr("timeouts")
         print("No popup found.")
 
-def scrape_table(driver, club_name: str, league_name: str) -> pd.DataFrame:
- 
-    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "table.items")))
+SCRAPE_MODE = "page_source"   # live pages: "page_source" = one DOM snapshot parsed with lxml; "selenium" = per-cell
+                              # WebDriver calls. Cached and replayed pages are always parsed from their HTML.
+
+SQUAD_ROWS_XPATH = (
+    "//table[contains(concat(' ', normalize-space(@class), ' '), ' items ')]//tbody//tr"
+    "[contains(concat(' ', normalize-space(@class), ' '), ' odd ')"
+    " or contains(concat(' ', normalize-space(@class), ' '), ' even ')]"
+)
+
+
+def squad_row(player_lines, dob_age, height, foot, market_value, club_name, league_name) -> dict:
+    player = player_lines[0] if player_lines else ""
+    position = player_lines[1] if len(player_lines) > 1 else ""
+    if market_value == "—":
+        market_value = "N/A"
+    return {
+        "Player": player,
+        "Position": position,
+        "Date of birth / Age": dob_age,
+        "Height": height,
+        "Foot": foot,
+        "Market value": market_value,
+        "Club": club_name,
+        "League": league_name
+    }
+
+def _cell_text(td) -> str:
+    return " ".join(td.text_content().split())
+
+def _cell_lines(td) -> list[str]:
+    """Rendered lines of a cell: one per row of TM's nested inline-table, else per text line."""
+    nested = td.xpath(".//tr")
+    if nested:
+        lines = [_cell_text(tr) for tr in nested]
+    else:
+        lines = [" ".join(line.split()) for line in td.text_content().split("\n")]
+    return [line for line in lines if line]
+
+def parse_squad_table(html: str, club_name: str, league_name: str) -> pd.DataFrame:
+    """Parse the squad `table.items` out of a saved page_source, without touching the driver."""
+    if not html.strip():
+        return pd.DataFrame()
+    tree = lxml_html.fromstring(html)
+    data = []
+    for row in tree.xpath(SQUAD_ROWS_XPATH):
+        tds = row.xpath(".//td")  # descendant cells, same order as find_elements(By.TAG_NAME, "td")
+        if len(tds) < 13:
+            continue
+        data.append(squad_row(_cell_lines(tds[1]), _cell_text(tds[5]), _cell_text(tds[8]),
+                              _cell_text(tds[9]), _cell_text(tds[12]), club_name, league_name))
+    return pd.DataFrame(data)
+
+def _scrape_table_selenium(driver, club_name: str, league_name: str) -> pd.DataFrame:
     rows = driver.find_elements(By.CSS_SELECTOR, "table.items tbody tr.odd, table.items tbody tr.even")
 
     data = []
@@ -103,38 +157,70 @@ def scrape_table(driver, club_name: str, league_name: str) -> pd.DataFrame:
 
 
         player_lines = [line.strip() for line in tds[1].text.split("\n") if line.strip()]
-        player = player_lines[0] if player_lines else ""
-        position = player_lines[1] if len(player_lines) > 1 else ""
-
-
         dob_age = tds[5].text.strip()
         height = tds[8].text.strip()
         foot = tds[9].text.strip()
         market_value = tds[12].text.strip()
-        if market_value == "—":
-            market_value = "N/A"
-
-        data.append({
-            "Player": player,
-            "Position": position,
-            "Date of birth / Age": dob_age,
-            "Height": height,
-            "Foot": foot,
-            "Market value": market_value,
-            "Club": club_name,
-            "League": league_name
-        })
+
+        data.append(squad_row(player_lines, dob_age, height, foot, market_value, club_name, league_name))
 
     return pd.DataFrame(data)
 
-def run_one(driver, club_conf: dict):
+def scrape_table(driver, club_name: str, league_name: str, mode: str = SCRAPE_MODE) -> pd.DataFrame:
+ 
+    with metrics.span("tm.wait_table"):
+        try:
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, "table.items")))
+        except TimeoutException:
+            metrics.incr("timeouts")
+            raise
+    if mode == "page_source":
+        try:
+            html = driver.page_source
+            metrics.incr("bytes_parsed", len(html))
+            with metrics.span("tm.parse"):
+                df = parse_squad_table(html, club_name, league_name)
+            if not df.empty:
+                return df
+            print("page_source parse found no rows — falling back to Selenium.")
+        except Exception as e:
+            print(f"page_source parse failed ({e}) — falling back to Selenium.")
+    with metrics.span("tm.parse_selenium"):
+        return _scrape_table_selenium(driver, club_name, league_name)
+
+def club_confs(season: int = SEASON) -> list[dict]:
+    """CLUBS with their squad URL and output season set for `season`."""
+    return [{**c, "url": tm_squad_url(*c["tm"], season), "season": season} for c in CLUBS]
+
+def run_one(driver, club_conf: dict, cache: PageCache | None = None):
     print(f"\n--- Scraping {club_conf['name']} ---")
-    driver.get(club_conf["url"])
-    accept_popup(driver)
-    df = scrape_table(driver, club_conf["name"], club_conf["league"])
+    cached = cache.get(club_conf["url"]) if cache else None
+    df = None
+    if cached is not None:
+        metrics.incr("cache_hits")
+    if cached is not None:
+        # a saved page is always parsed from its HTML, whatever SCRAPE_MODE says (no driver on --replay)
+        metrics.incr("bytes_parsed", len(cached))
+        with metrics.span("tm.parse"):
+            df = parse_squad_table(cached, club_conf["name"], club_conf["league"])
+        if df.empty:
+            if driver is None:
+                raise RuntimeError(f"No squad rows for {club_conf['name']} in the saved page.")
+            print("Saved page has no squad rows — fetching it again.")
+            df = None
+    if df is None:
+        with metrics.span("tm.get"):
+            driver.get(club_conf["url"])
+        metrics.incr("pages_fetched")
+        with metrics.span("tm.consent"):
+            accept_popup(driver)
+        df = scrape_table(driver, club_conf["name"], club_conf["league"])
+        if cache:
+            cache.put(club_conf["url"], driver.page_source)
 
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    out_path = OUTPUT_DIR / club_conf["csv"]
+    out_dir = output_dir(club_conf.get("season", SEASON), OUTPUT_ROOT)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / club_conf["csv"]
     df.to_csv(out_path, index=False, encoding="utf-8-sig")
     print(f"Extracted {len(df)} rows -> {out_path.resolve()}")
 
@@ -142,14 +228,165 @@ def run_one(driver, club_conf: dict):
         print(df.head())
     except Exception:
         pass
+    return df
 
-def main():
+def _club_worker(jobs, results):
+    """Worker process: own driver and cache handle, drains club configs until it sees None."""
     driver = make_driver()
+    cache = PageCache(CACHE_DIR)
     try:
-        for club_conf in CLUBS:
-            run_one(driver, club_conf)
+        while True:
+            club_conf = jobs.get()
+            if club_conf is None:
+                break
+            t0 = time.perf_counter()
+            metrics.reset()  # each result carries just this club's spans and counters
+            try:
+                df = run_one(driver, club_conf, cache)
+                results.put({"club": club_conf["name"], "rows": len(df),
+                             "seconds": time.perf_counter() - t0, "error": "", "metrics": metrics.snapshot()})
+            except Exception as e:
+                results.put({"club": club_conf["name"], "rows": 0,
+                             "seconds": time.perf_counter() - t0, "error": repr(e), "metrics": metrics.snapshot()})
+    finally:
+        driver.quit()
+
+def run_parallel(clubs: list[dict], workers: int = MAX_WORKERS) -> list[dict]:
+    """Scrape `clubs` across up to `workers` processes, each with its own Chrome; return per-club timings."""
+    workers = max(1, min(workers, len(clubs)))
+    jobs, results = mp.Queue(), mp.Queue()
+    for club_conf in clubs:
+        jobs.put(club_conf)
+    for _ in range(workers):
+        jobs.put(None)
+
+    procs = [mp.Process(target=_club_worker, args=(jobs, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    report = []
+    while len(report) < len(clubs):
+        if not any(p.is_alive() for p in procs) and results.empty():
+            break  # a worker died before reporting (e.g. chromedriver failed to start)
+        try:
+            r = results.get(timeout=1)
+        except queue.Empty:
+            continue
+        metrics.merge(r.pop("metrics", {}))
+        report.append(r)
+    for p in procs:
+        p.join()
+
+    done = {r["club"] for r in report}
+    report += [{"club": c["name"], "rows": 0, "seconds": 0.0, "error": "worker exited"}
+               for c in clubs if c["name"] not in done]
+    order = {c["name"]: i for i, c in enumerate(clubs)}
+    return sorted(report, key=lambda r: order[r["club"]])
+
+def _queue_worker(db_path, snapshots):
+    """
+    Worker process: own driver, claims Transfermarkt jobs from the SQLite queue until none are
+    pending, then sends its metrics home on `snapshots`.
+    """
+    jobs = JobQueue(db_path)
+    driver = make_driver()
+    cache = PageCache(CACHE_DIR)
+    try:
+        while (job := jobs.claim("transfermarkt")) is not None:
+            club_conf = {"name": job["club"], "league": job["league"], "url": job["url"], "csv": job["out"],
+                          "season": job["season"]}
+            try:
+                df = run_one(driver, club_conf, cache)
+                jobs.done(job["id"], len(df))
+            except Exception as e:
+                print(f"{job['club']} failed: {e!r}")
+                jobs.fail(job["id"], repr(e))
     finally:
         driver.quit()
+        jobs.close()
+        snapshots.put(metrics.snapshot())
+
+def run_queue(db_path, workers: int = MAX_WORKERS) -> dict:
+    """Drain the Transfermarkt jobs of a crawl queue (see crawl.py) with `workers` processes."""
+    jobs = JobQueue(db_path)
+    requeued = jobs.requeue_running("transfermarkt")
+    if requeued:
+        print(f"Requeued {requeued} jobs left running by an earlier run")
+    snapshots = mp.Queue()
+    procs = [mp.Process(target=_queue_worker, args=(db_path, snapshots)) for _ in range(max(1, workers))]
+    for p in procs:
+        p.start()
+    pending = len(procs)
+    while pending:
+        try:
+            metrics.merge(snapshots.get(timeout=1))  # drain before join: a full pipe blocks the child's exit
+            pending -= 1
+        except queue.Empty:
+            if not any(p.is_alive() for p in procs) and snapshots.empty():
+                break
+    for p in procs:
+        p.join()
+    counts = jobs.counts().get("transfermarkt", {})
+    jobs.close()
+    return counts
+
+def print_timing_report(report: list[dict], wall_seconds: float):
+    print(f"\n{'Club':<20}{'Rows':>6}{'Seconds':>10}  Status")
+    for r in report:
+        print(f"{r['club']:<20}{r['rows']:>6}{r['seconds']:>10.1f}  {r['error'] or 'ok'}")
+    busy = sum(r["seconds"] for r in report)
+    print(f"Wall clock {wall_seconds:.1f}s for {busy:.1f}s of club work")
+
+def main():
+    ap = argparse.ArgumentParser(description="Scrape Transfermarkt squad tables.")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="parallel browser processes (1 = serial run on a single driver)")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument("--record", metavar="BUNDLE", help="archive every page seen into a snapshot bundle (.zip)")
+    mode.add_argument("--replay", metavar="BUNDLE", help="parse pages from a snapshot bundle; no browser is started")
+    mode.add_argument("--queue", metavar="DB", help="drain the Transfermarkt jobs of a crawl queue instead of CLUBS")
+    ap.add_argument("--season", type=int, default=SEASON,
+                    help="season start year (2024 = 2024/25); a queue's jobs carry their own")
+    args = ap.parse_args()
+    clubs = club_confs(args.season)
+    if args.workers > 1 and (args.record or args.replay):
+        ap.error("--record/--replay run serially; drop --workers")
+
+    t0 = time.perf_counter()
+    if args.queue:
+        counts = run_queue(args.queue, args.workers)
+        print(f"Queue drained in {time.perf_counter() - t0:.1f}s:", counts)
+        metrics.export("scrapetransfermarket")
+        return
+    if args.workers > 1:
+        report = run_parallel(clubs, args.workers)
+        print_timing_report(report, time.perf_counter() - t0)
+        metrics.export("scrapetransfermarket")
+        return
+
+    driver, writer = None, None
+    if args.replay:
+        cache = ReplaySource(SnapshotReader(args.replay))
+    else:
+        driver = make_driver()
+        cache = PageCache(CACHE_DIR)
+        if args.record:
+            writer = SnapshotWriter(args.record)
+            cache = RecordingCache(writer, cache)
+    report = []
+    try:
+        for club_conf in clubs:
+            t_club = time.perf_counter()
+            df = run_one(driver, club_conf, cache)
+            report.append({"club": club_conf["name"], "rows": len(df),
+                           "seconds": time.perf_counter() - t_club, "error": ""})
+    finally:
+        if driver is not None:
+            driver.quit()
+        if writer is not None:
+            writer.close()
+        print("Page cache:", cache.stats())
+        metrics.export("scrapetransfermarket")
+    print_timing_report(report, time.perf_counter() - t0)
 
 if __name__ == "__main__":
     main()
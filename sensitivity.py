@@ -0,0 +1,158 @@
+# How stable are the role ranks under other reasonable weights and populations?
+#
+# Every sample draws role weights from a Dirichlet centred on ROLE_WEIGHTS (signs kept,
+# total weight kept) and a bootstrap resample of the role's eligible players, which sets
+# the mean/std the z-scores are taken against. All eligible players are then scored and
+# ranked under each sample. Per sample the resample enters only through multinomial
+# counts, so a batch of samples is a handful of matrix products:
+#   mu, sd   = (C @ X) / (C @ P) ...           C: samples x players bootstrap counts
+#   scores   = (w / sd) @ X.T - (w mu / sd) @ P.T
+# Ranks are 1 + the number of players scoring higher in that sample (no dense ties).
+# `rank` is the same ordinal rank under the default weights and the whole population, so
+# it sits on the quantiles' scale; `official_rank` is the dense rank from rankingplayers.py.
+# Usage: python sensitivity.py [--samples 5000] [--concentration 200] [--top 10] [--seed 0]
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scoring import (RANK_COLUMNS, ROLE_WEIGHTS, ROLES, UNDERRATED_RANK_COLUMNS, RankingConfig, feature_frame,
+                     listed_age, rank_players, weight_matrix)
+from storage import read_squads
+
+MIN_90S = 20
+MAX_AGE = 30            # as rankingplayers.py
+IN_PATH = Path("all_squads.csv")
+OUT_PATH = Path("rank_sensitivity.csv")
+SAMPLES = 5000
+CONCENTRATION = 200.0   # Dirichlet concentration: higher keeps samples closer to the default weights
+BATCH = 1000            # samples scored per batch of matrix products
+TOP_K = 10
+
+
+def sample_weights(w: np.ndarray, n: int, concentration: float, rng) -> np.ndarray:
+    """n x features weight vectors: Dirichlet over |w| around its default shares, signs and total kept."""
+    used = w != 0
+    out = np.zeros((n, len(w)))
+    total = np.abs(w[used]).sum()
+    out[:, used] = rng.dirichlet(concentration * np.abs(w[used]) / total, size=n) * total * np.sign(w[used])
+    return out
+
+
+def weighted_scores(X: np.ndarray, weights: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """
+    samples x players scores: sample s standardizes X against its rows weighted by the
+    counts C[s] and applies weights[s]. Missing values and zero-spread features score 0,
+    as in standardize_by_role.
+    """
+    present = ~np.isnan(X)
+    X0, P = np.where(present, X, 0.0), present.astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cnt = C @ P
+        mu = (C @ X0) / cnt
+        sd = np.sqrt(np.maximum((C @ (X0 * X0)) / cnt - mu * mu, 0.0))
+        a = weights / sd
+    bad = ~np.isfinite(a) | np.isclose(sd, 0.0)
+    a[bad] = 0.0
+    b = np.where(bad, 0.0, a * mu)
+    return a @ X0.T - b @ P.T
+
+
+def sample_scores(X: np.ndarray, weights: np.ndarray, rng) -> np.ndarray:
+    """weighted_scores() against one bootstrap resample of the rows per sample."""
+    n = len(X)
+    # bootstrap counts: one row of n draws with replacement per sample, tallied with a single bincount
+    draws = rng.integers(0, n, size=(len(weights), n)) + n * np.arange(len(weights))[:, None]
+    C = np.bincount(draws.ravel(), minlength=len(weights) * n).reshape(len(weights), n).astype(float)
+    return weighted_scores(X, weights, C)
+
+
+def ordinal_ranks(scores: np.ndarray) -> np.ndarray:
+    """1-based rank of every player (column) within each sample (row); highest score = 1."""
+    order = np.argsort(-scores, axis=1)
+    ranks = np.empty(scores.shape, dtype=np.int32)
+    np.put_along_axis(ranks, order, np.arange(1, scores.shape[1] + 1, dtype=np.int32)[None, :], axis=1)
+    return ranks
+
+
+def summarize(ranks: np.ndarray, top_k: int) -> pd.DataFrame:
+    """Distribution of each player's rank; `ranks` is players x samples."""
+    p05, p50, p95 = np.percentile(ranks, [5, 50, 95], axis=1)
+    return pd.DataFrame({"rank_median": p50, "rank_p05": p05, "rank_p95": p95, "rank_mean": ranks.mean(axis=1),
+                         "rank_std": ranks.std(axis=1), f"top{top_k}_share": (ranks <= top_k).mean(axis=1)})
+
+
+def role_sensitivity(df: pd.DataFrame, role: str, samples: int, concentration: float, top_k: int,
+                     rng, weights: dict = ROLE_WEIGHTS, max_age: int | None = MAX_AGE) -> pd.DataFrame:
+    """Rank and underrated-rank distributions of `role`'s eligible players over `samples` samples."""
+    W = weight_matrix(weights)[role]
+    W = W[W != 0]
+    rows = df.index[(df["role"] == role) & (df["90s Played"] >= MIN_90S)]
+    if not len(rows):
+        return pd.DataFrame()
+    X = feature_frame(df.loc[rows], W.index).to_numpy()
+    mv = df.loc[rows, "_market_value_eur"].to_numpy(float)
+    underrated_ok = mv > 0
+    if max_age is not None:
+        age_column = "age" if "age" in df.columns else "_age_at_ref"
+        underrated_ok &= (listed_age(df.loc[rows, age_column]) < max_age).fillna(False).to_numpy()
+
+    # reference: default weights on the whole population, ranked like the samples
+    ref = weighted_scores(X, W.to_numpy()[None, :], np.ones((1, len(X))))
+    ref_ranks = {"rank": ordinal_ranks(ref)[0], "underrated_rank": ordinal_ranks(ref[:, underrated_ok] / mv[underrated_ok])[0]}
+
+    ranks, u_ranks = [], []
+    for start in range(0, samples, BATCH):
+        w = sample_weights(W.to_numpy(), min(BATCH, samples - start), concentration, rng)
+        scores = sample_scores(X, w, rng)
+        ranks.append(ordinal_ranks(scores))
+        if underrated_ok.any():
+            u_ranks.append(ordinal_ranks(scores[:, underrated_ok] / mv[underrated_ok]))
+
+    out = []
+    for metric, ids, rk, official in [("rank", rows, ranks, RANK_COLUMNS[role]),
+                                      ("underrated_rank", rows[underrated_ok], u_ranks, UNDERRATED_RANK_COLUMNS[role])]:
+        if not rk:
+            continue
+        stats = summarize(np.ascontiguousarray(np.concatenate(rk).T), top_k)
+        stats.insert(0, "official_rank", df.loc[ids, official].to_numpy())
+        stats.insert(0, "rank", ref_ranks[metric])
+        stats.insert(0, "metric", metric)
+        stats.insert(0, "role", role)
+        for col in reversed(["player", "Club", "League"]):
+            if col in df.columns:
+                stats.insert(0, col, df.loc[ids, col].to_numpy())
+        out.append(stats)
+    return pd.concat(out, ignore_index=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Rank stability under Dirichlet weight draws and bootstrap resamples.")
+    ap.add_argument("--samples", type=int, default=SAMPLES)
+    ap.add_argument("--concentration", type=float, default=CONCENTRATION)
+    ap.add_argument("--top", type=int, default=TOP_K, help="report each player's share of samples in the top N")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    df = rank_players(read_squads(IN_PATH), RankingConfig(min_90s=MIN_90S, max_age=MAX_AGE))
+    rng = np.random.default_rng(args.seed)
+    result = pd.concat([role_sensitivity(df, role, args.samples, args.concentration, args.top, rng)
+                        for role in ROLES], ignore_index=True)
+    result.to_csv(OUT_PATH, index=False, encoding="utf-8-sig")
+    print(f"{args.samples} samples x {len(result)} player-ranks in {time.perf_counter() - t0:.1f}s → {OUT_PATH}")
+
+    show = ["player", "Club", "rank", "rank_median", "rank_p05", "rank_p95", f"top{args.top}_share"]
+    for role in ROLES:
+        for metric in ["rank", "underrated_rank"]:
+            sub = result[(result["role"] == role) & (result["metric"] == metric)]
+            if len(sub):
+                print(f"\n{role} {metric} — top {args.top} by median:\n",
+                      sub.nsmallest(args.top, "rank_median")[[c for c in show if c in sub.columns]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
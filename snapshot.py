@@ -0,0 +1,113 @@
+# Record/replay of fetched pages as a single compressed snapshot bundle.
+#
+# Record: wrap the page cache in RecordingCache and every page the scrapers see is
+# archived. Replay: hand ReplaySource to the scrapers in place of the cache and
+# they parse straight from the bundle, with no Chrome session at all.
+
+import hashlib
+import json
+import threading
+import time
+import zipfile
+from urllib.parse import urlparse
+
+MANIFEST = "manifest.json"
+
+
+def _member_name(url: str) -> str:
+    host = urlparse(url).netloc or "_"
+    return f"pages/{host}/{hashlib.sha256(url.encode('utf-8')).hexdigest()}.html"
+
+
+class SnapshotWriter:
+    """Append pages to an LZMA-compressed zip; the URL manifest is written on close()."""
+
+    def __init__(self, path):
+        self.path = path
+        self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_LZMA)
+        self._manifest = {}
+        self._lock = threading.Lock()
+
+    def record(self, url: str, html: str):
+        with self._lock:
+            if url in self._manifest:
+                return
+            member = _member_name(url)
+            self._zip.writestr(member, html.encode("utf-8"))
+            self._manifest[url] = {"member": member, "recorded_at": time.time(), "bytes": len(html)}
+
+    def close(self):
+        with self._lock:
+            self._zip.writestr(MANIFEST, json.dumps(self._manifest, indent=1))
+            self._zip.close()
+        print(f"Recorded {len(self._manifest)} pages → {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SnapshotReader:
+    def __init__(self, path):
+        self.path = path
+        self._zip = zipfile.ZipFile(path, "r")
+        self.manifest = json.loads(self._zip.read(MANIFEST))
+
+    def urls(self, host: str | None = None) -> list[str]:
+        return [u for u in self.manifest if host is None or urlparse(u).netloc.endswith(host)]
+
+    def get(self, url: str) -> str | None:
+        entry = self.manifest.get(url)
+        if entry is None:
+            return None
+        return self._zip.read(entry["member"]).decode("utf-8")
+
+    def close(self):
+        self._zip.close()
+
+
+class RecordingCache:
+    """PageCache stand-in that archives every page served or stored; `inner` may be None."""
+
+    def __init__(self, writer: SnapshotWriter, inner=None):
+        self.writer = writer
+        self.inner = inner
+
+    def get(self, url: str) -> str | None:
+        html = self.inner.get(url) if self.inner else None
+        if html is not None:
+            self.writer.record(url, html)
+        return html
+
+    def put(self, url: str, html: str):
+        self.writer.record(url, html)
+        if self.inner:
+            return self.inner.put(url, html)
+
+    def stats(self) -> dict:
+        return self.inner.stats() if self.inner else {}
+
+
+class ReplaySource:
+    """PageCache stand-in that serves every page from a snapshot bundle and never misses to the network."""
+
+    def __init__(self, reader: SnapshotReader):
+        self.reader = reader
+        self.counters = {"hits": 0, "missing": 0}
+
+    def get(self, url: str) -> str:
+        html = self.reader.get(url)
+        if html is None:
+            self.counters["missing"] += 1
+            print(f"Not in snapshot: {url}")
+            return ""
+        self.counters["hits"] += 1
+        return html
+
+    def put(self, url: str, html: str):
+        pass
+
+    def stats(self) -> dict:
+        return dict(self.counters)
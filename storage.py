@@ -0,0 +1,114 @@
+# Typed columnar storage for the squad and ranked datasets.
+#
+# CSV throws the types away ('71.9%', categorical text, dates), so every reader
+# used to re-coerce every column. The Parquet copies carry a declared schema
+# instead and can be read column-selectively.
+# Usage: python storage.py all_squads.csv [more.csv ...]   -> writes <name>.parquet
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_PARQUET = True
+except ImportError:
+    HAVE_PARQUET = False
+
+# Free text kept as strings; everything not listed anywhere is a float64 stat column.
+STRING_COLUMNS = ["player", "Player", "achievements", "Date of birth / Age", "Height", "Market value"]
+CATEGORY_COLUMNS = ["nation", "Position", "Foot", "Club", "League", "role"]
+DATETIME_COLUMNS = ["_birth_date"]
+INT_COLUMNS = ["_age_at_ref"]
+AGE_COLUMNS = ["age"]          # FBref's listed age: whole years, also from "29-123" (years-days)
+
+
+def listed_age(age: pd.Series) -> pd.Series:
+    """Age in whole years; FBref lists ages as "29-123" (years-days), numbers pass through."""
+    if pd.api.types.is_numeric_dtype(age):
+        return age.astype("float64")
+    years = age.astype("string").str.extract(r"^\s*(\d+)")[0]
+    return pd.to_numeric(years.astype(object), errors="coerce").astype("float64")
+
+
+def column_dtype(col: str) -> str:
+    if col in STRING_COLUMNS:
+        return "string"
+    if col in CATEGORY_COLUMNS:
+        return "category"
+    if col in DATETIME_COLUMNS:
+        return "datetime64[ns]"
+    if col in INT_COLUMNS:
+        return "Int64"
+    return "float64"
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast every column to its declared type; stat columns lose '%' and thousands commas."""
+    out = {}
+    for col in df.columns:
+        dtype = column_dtype(col)
+        s = df[col]
+        if col in AGE_COLUMNS:
+            out[col] = listed_age(s)
+        elif dtype == "float64":
+            if not pd.api.types.is_numeric_dtype(s):
+                s = s.astype("string").str.replace("%", "", regex=False).str.replace(",", "", regex=False)
+                s = pd.to_numeric(s.str.strip().astype(object), errors="coerce")
+            out[col] = s.astype("float64")
+        elif dtype == "datetime64[ns]":
+            out[col] = pd.to_datetime(s, errors="coerce")
+        elif dtype == "Int64":
+            out[col] = pd.to_numeric(s, errors="coerce").astype("Int64")
+        else:
+            out[col] = s.astype(dtype)
+    return pd.DataFrame(out, index=df.index)
+
+
+def write_parquet(df: pd.DataFrame, path) -> Path | None:
+    """Write `df` with the declared schema; returns None (and says so) without pyarrow."""
+    path = Path(path)
+    if not HAVE_PARQUET:
+        print(f"pyarrow not installed — skipped {path}")
+        return None
+    apply_schema(df).to_parquet(path, index=False)
+    return path
+
+
+def squad_columns(csv_path) -> list[str]:
+    """Column names of a squad table (its .parquet sibling's when present), without reading any rows."""
+    csv_path = Path(csv_path)
+    pq_path = csv_path.with_suffix(".parquet")
+    if HAVE_PARQUET and pq_path.exists():
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(pq_path).names)
+    return list(pd.read_csv(csv_path, nrows=0, encoding="utf-8-sig").columns)
+
+
+def read_squads(csv_path, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Load a squad table, preferring the typed .parquet sibling of `csv_path`.
+    Only `columns` (those present) are read; the CSV fallback gets the same schema applied.
+    """
+    csv_path = Path(csv_path)
+    pq_path = csv_path.with_suffix(".parquet")
+    wanted = None if columns is None else set(columns)
+    if HAVE_PARQUET and pq_path.exists():
+        if wanted is not None:
+            import pyarrow.parquet as pq
+            columns = [c for c in pq.read_schema(pq_path).names if c in wanted]  # keep file order
+        return pd.read_parquet(pq_path, columns=columns)
+    usecols = None if wanted is None else (lambda c: c in wanted)
+    return apply_schema(pd.read_csv(csv_path, usecols=usecols))
+
+
+def main(paths):
+    for p in paths:
+        out = write_parquet(pd.read_csv(p), Path(p).with_suffix(".parquet"))
+        if out:
+            print(f"{p} → {out}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ["all_squads.csv"])
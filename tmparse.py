@@ -0,0 +1,128 @@
+# Vectorized parsers for the Transfermarkt text columns:
+#   "Market value"         '€90.00m', '€750k', 'N/A'  -> euros (float)
+#   "Date of birth / Age"  '14.12.1996 (28)'          -> birth date, listed age, age at a reference date
+#   "Height"               '1,76m'                    -> centimetres (float)
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  -- Arrow-backed strings run .str ops in compiled kernels
+    _STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    _STRING_DTYPE = "string"
+
+_DMY = r"(?P<day>\d{1,2})[./](?P<month>\d{1,2})[./](?P<year>\d{4})"
+_MDY_TEXT = r"(?P<text>[A-Za-z]{3} \d{1,2}, \d{4})"   # 'Dec 14, 1996' on some TM mirrors
+
+
+def market_value_to_eur(x):
+    """
+    Accepts values like '€50m', '€750k', '50,000,000', 50000000, or NaN.
+    Returns numeric euros (float) or NaN. Scalar reference for parse_market_value().
+    """
+    if pd.isna(x):
+        return np.nan
+    s = str(x).strip().lower()
+    for ch in ["€", "$", "£", ",", " "]:
+        s = s.replace(ch, "")
+
+    mult = 1.0
+    if s.endswith("m"):
+        mult = 1_000_000.0
+        s = s[:-1]
+    elif s.endswith("k"):
+        mult = 1_000.0
+        s = s[:-1]
+
+    try:
+        base = float("".join(ch for ch in s if (ch.isdigit() or ch == ".")))
+        return base * mult
+    except ValueError:
+        return np.nan
+
+
+def _on_uniques(values: pd.Series, parse):
+    """
+    Run a column parser over the distinct values only and broadcast back by factor code.
+    Scraped text columns repeat heavily (a few thousand prices or birth dates across a
+    league), so this turns N string operations into ~n_unique of them.
+    """
+    codes, uniques = pd.factorize(values.astype(object), use_na_sentinel=True)
+    # a trailing missing entry: code -1 (NaN input) indexes it from the end
+    distinct = pd.Series(list(uniques) + [None], dtype=object).astype(_STRING_DTYPE)
+    out = parse(distinct).iloc[codes]
+    out.index = values.index
+    return out
+
+
+def _market_value_unique(s: pd.Series) -> pd.Series:
+    s = s.str.strip().str.lower().str.replace(r"[€$£, ]", "", regex=True)
+    mult = np.select(
+        [s.str.endswith("m").fillna(False).to_numpy(bool), s.str.endswith("k").fillna(False).to_numpy(bool)],
+        [1_000_000.0, 1_000.0],
+        1.0,
+    )
+    digits = s.str.replace(r"[mk]$", "", regex=True).str.replace(r"[^0-9.]", "", regex=True)
+    base = pd.to_numeric(digits.astype(object), errors="coerce")
+    return pd.Series(np.asarray(base, dtype="float64") * mult, index=s.index)
+
+
+def parse_market_value(values: pd.Series) -> pd.Series:
+    """Column-at-once equivalent of market_value_to_eur()."""
+    if pd.api.types.is_numeric_dtype(values):
+        return pd.to_numeric(values, errors="coerce").astype("float64")
+    return _on_uniques(values, _market_value_unique).rename(values.name)
+
+
+def _birth_date_unique(s: pd.Series) -> pd.DataFrame:
+    dmy = s.str.extract(_DMY).astype(object)
+    birth = pd.to_datetime(dmy["year"] + "-" + dmy["month"] + "-" + dmy["day"],
+                           format="%Y-%m-%d", errors="coerce")
+    missing = birth.isna()
+    if missing.any():
+        text = s[missing].str.extract(_MDY_TEXT)["text"].astype(object)
+        birth[missing] = pd.to_datetime(text, format="%b %d, %Y", errors="coerce")
+    listed_age = pd.to_numeric(s.str.extract(r"\((\d{1,3})\)")[0].astype(object), errors="coerce")
+    return pd.DataFrame({"birth_date": birth, "listed_age": listed_age.astype("Int64")}, index=s.index)
+
+
+def parse_birth_date(values: pd.Series) -> pd.DataFrame:
+    """Split 'dd.mm.yyyy (age)' into columns birth_date (datetime64) and listed_age (Int64)."""
+    return _on_uniques(values, _birth_date_unique)
+
+
+def age_at(birth_date: pd.Series, ref_date) -> pd.Series:
+    """Whole years between each birth date and `ref_date` (Int64, <NA> where unknown)."""
+    ref = pd.Timestamp(ref_date)
+    years = ref.year - birth_date.dt.year
+    before_birthday = (birth_date.dt.month > ref.month) | (
+        (birth_date.dt.month == ref.month) & (birth_date.dt.day > ref.day)
+    )
+    return (years - before_birthday.astype("Int64")).astype("Int64")
+
+
+def _height_unique(s: pd.Series) -> pd.Series:
+    s = s.str.strip().str.lower().str.replace(",", ".", regex=False)
+    parts = s.str.extract(r"^(?P<num>\d+(?:\.\d+)?)\s*(?P<unit>cm|m)?$").astype(object)
+    num = pd.to_numeric(parts["num"], errors="coerce")
+    metres = (parts["unit"] == "m") | (parts["unit"].isna() & (num < 3))
+    return num.where(~metres, num * 100).round(1).astype("float64")
+
+
+def parse_height_cm(values: pd.Series) -> pd.Series:
+    """'1,76m' / '1.76 m' -> 176.0, '176cm' -> 176.0, anything else -> NaN."""
+    return _on_uniques(values, _height_unique).rename(values.name)
+
+
+def add_parsed_columns(df: pd.DataFrame, ref_date, mv_col: str = "Market value",
+                       dob_col: str = "Date of birth / Age", height_col: str = "Height") -> pd.DataFrame:
+    """Add typed _market_value_eur, _birth_date, _age_at_ref and _height_cm columns in place."""
+    if mv_col in df.columns:
+        df["_market_value_eur"] = parse_market_value(df[mv_col])
+    if dob_col in df.columns:
+        df["_birth_date"] = parse_birth_date(df[dob_col])["birth_date"]
+        df["_age_at_ref"] = age_at(df["_birth_date"], ref_date)
+    if height_col in df.columns:
+        df["_height_cm"] = parse_height_cm(df[height_col])
+    return df